@@ -36,15 +36,6 @@ sys.path.insert(0, str(scripts_dir))
 from prompt_tuning_cli import cli
 
 if __name__ == '__main__':
-    # Load environment variables from .env file if it exists
-    env_file = Path('.env')
-    if env_file.exists():
-        try:
-            from dotenv import load_dotenv
-            load_dotenv()
-        except ImportError:
-            # dotenv is optional - continue without it
-            pass
-
+    # .env is loaded by the CLI group only for subcommands that need it
     cli()
 
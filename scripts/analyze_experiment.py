@@ -4,37 +4,190 @@ Analyze 20-round optimization experiment results.
 Generates detailed statistics, convergence analysis, and recommendations.
 """
 
-import json
 import sys
+from dataclasses import dataclass, field
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from prompt_tuning.json_io import load_json
+except ImportError:
+    from scripts.prompt_tuning.json_io import load_json
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional - long histories are scanned in pure Python instead
+    np = None
+
+try:
+    import ijson
+except ImportError:
+    # ijson is optional - large results files are loaded whole instead
+    ijson = None
+
+# Below this length the pure-Python scan beats the numpy conversion overhead
+VECTORIZE_MIN_HISTORY = 256
+
+# Results files at least this large are streamed when ijson is available
+STREAM_MIN_BYTES = 64 * 1024 * 1024
+
+# ijson events carrying a scalar value
+_SCALAR_EVENTS = {"string", "number", "boolean", "null"}
+
+# Fetch the per-iteration fields with a single C-level call in the scan loops
+_get_score = itemgetter("score")
+_get_best = itemgetter("best_score")
+_get_score_best = itemgetter("score", "best_score")
 
 
 def load_results(results_dir: Path) -> Dict[str, Any]:
     """Load optimization results."""
-    results_file = results_dir / "optimization_final_results.json"
-    with open(results_file, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_json(results_dir / "optimization_final_results.json")
 
 
-def analyze_convergence(iteration_history: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Analyze convergence behavior."""
-    # Find last improvement
-    last_improvement_idx = -1
+def stream_results(results_file: Path) -> Tuple[Dict[str, Any], "HistoryScan"]:
+    """Stream a results file with ijson, scanning iteration_history without materializing it.
+
+    Returns the top-level scalar fields and the history scan.
+    """
+    results: Dict[str, Any] = {}
+    with open(results_file, "rb") as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if event in _SCALAR_EVENTS and prefix and "." not in prefix:
+                results[prefix] = value
+
+        f.seek(0)
+        scan = scan_history(ijson.items(f, "iteration_history.item", use_float=True))
+
+    return results, scan
+
+
+@dataclass
+class HistoryScan:
+    """Aggregates collected from a single pass over the iteration history."""
+
+    count: int = 0
+    min_score: float = 0.0
+    max_score: float = 0.0
+    sum_score: float = 0.0
+    last_improvement_idx: int = -1
+    total_improvements: int = 0
+    plateau_min: float = 0.0
+    plateau_max: float = 0.0
+    plateau_sum: float = 0.0
+    plateau_count: int = 0
+    deltas: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def scan_history(iteration_history: Iterable[Dict[str, Any]]) -> HistoryScan:
+    """Walk the iteration history once, collecting every statistic the analysis needs.
+
+    Accepts any iterable so streamed histories can be scanned without building a list.
+    """
+    if np is not None and isinstance(iteration_history, list) and len(iteration_history) >= VECTORIZE_MIN_HISTORY:
+        return _scan_history_vectorized(iteration_history)
+
+    scan = HistoryScan()
+    prev_best = 0.0
+
     for i, it in enumerate(iteration_history):
-        if it["score"] == it["best_score"]:
-            last_improvement_idx = i
+        score, best_score = _get_score_best(it)
+        if i == 0:
+            scan.min_score = scan.max_score = score
+            prev_best = best_score
+
+        scan.count += 1
+        scan.sum_score += score
+        scan.min_score = min(scan.min_score, score)
+        scan.max_score = max(scan.max_score, score)
+
+        if score == best_score:
+            # An improvement resets the plateau that follows it
+            scan.last_improvement_idx = i
+            scan.total_improvements += 1
+            scan.plateau_count = 0
+            scan.plateau_sum = 0.0
+
+            if score > prev_best:
+                delta = score - prev_best
+                scan.deltas.append(
+                    {
+                        "iteration": it["iteration"],
+                        "score": score,
+                        "delta": delta,
+                        "percent": (delta / prev_best * 100) if prev_best > 0 else 0,
+                    }
+                )
+                prev_best = score
+        else:
+            if scan.plateau_count == 0:
+                scan.plateau_min = scan.plateau_max = score
+            elif score < scan.plateau_min:
+                scan.plateau_min = score
+            elif score > scan.plateau_max:
+                scan.plateau_max = score
+            scan.plateau_sum += score
+            scan.plateau_count += 1
+
+    return scan
+
+
+def _scan_history_vectorized(iteration_history: List[Dict[str, Any]]) -> HistoryScan:
+    """Compute the same aggregates as scan_history with numpy column operations."""
+    count = len(iteration_history)
+    score = np.fromiter(map(_get_score, iteration_history), dtype=np.float64, count=count)
+    best = np.fromiter(map(_get_best, iteration_history), dtype=np.float64, count=count)
+
+    scan = HistoryScan(
+        count=count,
+        min_score=score.min().item(),
+        max_score=score.max().item(),
+        sum_score=score.sum().item(),
+    )
+
+    improved_idx = np.flatnonzero(score == best)
+    scan.total_improvements = int(improved_idx.size)
+    scan.last_improvement_idx = int(improved_idx[-1]) if improved_idx.size else -1
+
+    plateau = score[scan.last_improvement_idx + 1 :]
+    if plateau.size:
+        scan.plateau_min = plateau.min().item()
+        scan.plateau_max = plateau.max().item()
+        scan.plateau_sum = plateau.sum().item()
+        scan.plateau_count = int(plateau.size)
+
+    # A candidate counts as a delta when it beats the running best of the candidates before it
+    candidates = score[improved_idx]
+    prev_best = np.maximum.accumulate(np.concatenate(([best[0]], candidates)))[:-1]
+    kept = candidates > prev_best
+    for idx, new_score, old_best in zip(improved_idx[kept], candidates[kept], prev_best[kept]):
+        delta = (new_score - old_best).item()
+        scan.deltas.append(
+            {
+                "iteration": iteration_history[idx]["iteration"],
+                "score": new_score.item(),
+                "delta": delta,
+                "percent": (delta / old_best.item() * 100) if old_best > 0 else 0,
+            }
+        )
+
+    return scan
+
+
+def convergence_from_scan(scan: HistoryScan) -> Dict[str, Any]:
+    """Build the convergence summary from a history scan."""
+    last_improvement_idx = scan.last_improvement_idx
 
     # Calculate post-convergence iterations
-    total_iterations = len(iteration_history)
-    post_convergence = total_iterations - last_improvement_idx - 1 if last_improvement_idx >= 0 else 0
+    post_convergence = scan.count - last_improvement_idx - 1 if last_improvement_idx >= 0 else 0
 
     # Calculate score variance in plateau
     if post_convergence > 0:
-        plateau_scores = [it["score"] for it in iteration_history[last_improvement_idx + 1 :]]
-        plateau_min = min(plateau_scores) if plateau_scores else 0
-        plateau_max = max(plateau_scores) if plateau_scores else 0
-        plateau_avg = sum(plateau_scores) / len(plateau_scores) if plateau_scores else 0
+        plateau_min = scan.plateau_min
+        plateau_max = scan.plateau_max
+        plateau_avg = scan.plateau_sum / scan.plateau_count
         plateau_variance = plateau_max - plateau_min
     else:
         plateau_min = plateau_max = plateau_avg = plateau_variance = 0
@@ -48,106 +201,103 @@ def analyze_convergence(iteration_history: List[Dict[str, Any]]) -> Dict[str, An
         "plateau_avg": plateau_avg,
         "plateau_min": plateau_min,
         "plateau_max": plateau_max,
-        "total_improvements": len([it for it in iteration_history if it["score"] == it["best_score"]]),
+        "total_improvements": scan.total_improvements,
     }
 
 
+def analyze_convergence(iteration_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Analyze convergence behavior."""
+    return convergence_from_scan(scan_history(iteration_history))
+
+
 def calculate_improvement_deltas(iteration_history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Calculate improvement deltas for each successful iteration."""
-    deltas = []
-    prev_best = iteration_history[0]["best_score"] if iteration_history else 0
-
-    for it in iteration_history:
-        if it["score"] == it["best_score"] and it["score"] > prev_best:
-            delta = it["score"] - prev_best
-            deltas.append(
-                {
-                    "iteration": it["iteration"],
-                    "score": it["score"],
-                    "delta": delta,
-                    "percent": (delta / prev_best * 100) if prev_best > 0 else 0,
-                }
-            )
-            prev_best = it["score"]
-
-    return deltas
-
-
-def print_analysis(results: Dict[str, Any]):
-    """Print comprehensive analysis."""
-    print("=" * 80)
-    print("20-ROUND OPTIMIZATION EXPERIMENT ANALYSIS")
-    print("=" * 80)
-    print()
+    return scan_history(iteration_history).deltas
+
+
+def print_analysis(results: Dict[str, Any], scan: Optional[HistoryScan] = None):
+    """Print comprehensive analysis.
+
+    A precomputed scan (e.g. from stream_results) is used instead of results["iteration_history"].
+    """
+    # Collect all lines and emit them with a single write
+    out: List[str] = []
+    out.append("=" * 80)
+    out.append("20-ROUND OPTIMIZATION EXPERIMENT ANALYSIS")
+    out.append("=" * 80)
+    out.append("")
 
     # Basic metrics
-    print("📊 BASIC METRICS")
-    print(f"  Project: {results['project']}")
-    print(f"  Max Iterations: {results['max_iterations']}")
-    print(f"  Baseline Score: {results['baseline_score']:.2f}")
-    print(f"  Final Score: {results['final_score']:.2f}")
+    out.append("📊 BASIC METRICS")
+    out.append(f"  Project: {results['project']}")
+    out.append(f"  Max Iterations: {results['max_iterations']}")
+    out.append(f"  Baseline Score: {results['baseline_score']:.2f}")
+    out.append(f"  Final Score: {results['final_score']:.2f}")
     improvement_pct = results["improvement"] / results["baseline_score"] * 100
-    print(f"  Improvement: +{results['improvement']:.2f} points ({improvement_pct:.2f}%)")
-    print()
+    out.append(f"  Improvement: +{results['improvement']:.2f} points ({improvement_pct:.2f}%)")
+    out.append("")
 
     # Convergence analysis
-    convergence = analyze_convergence(results["iteration_history"])
-    print("🎯 CONVERGENCE ANALYSIS")
-    print(f"  Converged: {'Yes' if convergence['converged'] else 'No'}")
+    if scan is None:
+        scan = scan_history(results["iteration_history"])
+    convergence = convergence_from_scan(scan)
+    out.append("🎯 CONVERGENCE ANALYSIS")
+    out.append(f"  Converged: {'Yes' if convergence['converged'] else 'No'}")
     if convergence["convergence_iteration"]:
-        print(f"  Convergence Iteration: {convergence['convergence_iteration']}")
-        print(f"  Post-Convergence Iterations: {convergence['post_convergence_iterations']}")
+        out.append(f"  Convergence Iteration: {convergence['convergence_iteration']}")
+        out.append(f"  Post-Convergence Iterations: {convergence['post_convergence_iterations']}")
         wasted_pct = convergence["wasted_iterations"] / results["max_iterations"] * 100
-        print(f"  Wasted Iterations: {convergence['wasted_iterations']} ({wasted_pct:.1f}%)")
-    print(f"  Total Improvements: {convergence['total_improvements']}")
-    print(f"  Plateau Variance: ±{convergence['plateau_variance']:.2f} points")
-    print(f"  Plateau Average: {convergence['plateau_avg']:.2f}")
-    print()
+        out.append(f"  Wasted Iterations: {convergence['wasted_iterations']} ({wasted_pct:.1f}%)")
+    out.append(f"  Total Improvements: {convergence['total_improvements']}")
+    out.append(f"  Plateau Variance: ±{convergence['plateau_variance']:.2f} points")
+    out.append(f"  Plateau Average: {convergence['plateau_avg']:.2f}")
+    out.append("")
 
     # Improvement deltas
-    deltas = calculate_improvement_deltas(results["iteration_history"])
-    print("📈 IMPROVEMENT TIMELINE")
-    for delta in deltas:
-        print(
-            f"  Iteration {delta['iteration']:2d}: {delta['score']:.2f} "
-            f"(+{delta['delta']:.2f}, +{delta['percent']:.2f}%)"
-        )
-    print()
+    deltas = scan.deltas
+    out.append("📈 IMPROVEMENT TIMELINE")
+    out.extend(
+        f"  Iteration {delta['iteration']:2d}: {delta['score']:.2f} "
+        f"(+{delta['delta']:.2f}, +{delta['percent']:.2f}%)"
+        for delta in deltas
+    )
+    out.append("")
 
     # Recommendations
-    print("💡 RECOMMENDATIONS")
+    out.append("💡 RECOMMENDATIONS")
     if convergence["wasted_iterations"] > 0:
-        print("  ⚠️  CRITICAL: Implement auto-stop after 5 consecutive non-improvements")
+        out.append("  ⚠️  CRITICAL: Implement auto-stop after 5 consecutive non-improvements")
         wasted_pct = convergence["wasted_iterations"] / results["max_iterations"] * 100
-        print(
+        out.append(
             f"     Potential savings: {convergence['wasted_iterations']} iterations ({wasted_pct:.1f}%)"
         )
 
     if len(deltas) > 1:
         # Check for diminishing returns
         if deltas[-1]["delta"] < deltas[0]["delta"] / 2:
-            print("  ⚠️  Diminishing returns detected:")
-            print(f"     First improvement: +{deltas[0]['delta']:.2f}")
-            print(f"     Last improvement: +{deltas[-1]['delta']:.2f}")
-            print("     Suggests approaching local optimum")
+            out.append("  ⚠️  Diminishing returns detected:")
+            out.append(f"     First improvement: +{deltas[0]['delta']:.2f}")
+            out.append(f"     Last improvement: +{deltas[-1]['delta']:.2f}")
+            out.append("     Suggests approaching local optimum")
 
     if convergence["plateau_variance"] > 5:
-        print(f"  ℹ️  High plateau variance (±{convergence['plateau_variance']:.2f}) suggests:")
-        print("     - Evolutionary mutations exploring diverse prompt space")
-        print("     - Consider reducing mutation strength near convergence")
+        out.append(f"  ℹ️  High plateau variance (±{convergence['plateau_variance']:.2f}) suggests:")
+        out.append("     - Evolutionary mutations exploring diverse prompt space")
+        out.append("     - Consider reducing mutation strength near convergence")
 
-    print()
+    out.append("")
 
     # Score distribution
-    print("📊 SCORE DISTRIBUTION")
-    scores = [it["score"] for it in results["iteration_history"]]
-    print(f"  Min: {min(scores):.2f}")
-    print(f"  Max: {max(scores):.2f}")
-    print(f"  Avg: {sum(scores)/len(scores):.2f}")
-    print(f"  Range: {max(scores) - min(scores):.2f}")
-    print()
+    out.append("📊 SCORE DISTRIBUTION")
+    out.append(f"  Min: {scan.min_score:.2f}")
+    out.append(f"  Max: {scan.max_score:.2f}")
+    out.append(f"  Avg: {scan.sum_score/scan.count:.2f}")
+    out.append(f"  Range: {scan.max_score - scan.min_score:.2f}")
+    out.append("")
+
+    out.append("=" * 80)
 
-    print("=" * 80)
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def main():
@@ -161,6 +311,12 @@ def main():
         print(f"Error: Results directory not found: {results_dir}")
         sys.exit(1)
 
+    results_file = results_dir / "optimization_final_results.json"
+    if ijson is not None and results_file.stat().st_size >= STREAM_MIN_BYTES:
+        results, scan = stream_results(results_file)
+        print_analysis(results, scan)
+        return
+
     results = load_results(results_dir)
     print_analysis(results)
 
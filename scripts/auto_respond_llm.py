@@ -5,229 +5,206 @@ Auto-responder for file-based LLM communication.
 Monitors .pr-faq-validator/llm_requests/ for new requests and generates
 appropriate responses in .pr-faq-validator/llm_responses/.
 
+When the optional watchfiles package is installed, continuous mode wakes
+on filesystem notifications instead of polling the request directory.
+
 Based on bloginator's auto_respond_llm.py implementation.
 """
 
 import argparse
 import hashlib
 import json
+import logging
+import os
 import random
+import re
+import string
+import tempfile
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
+try:
+    from prompt_tuning.json_io import dumps_json, load_json
+except ImportError:
+    from scripts.prompt_tuning.json_io import dumps_json, load_json
 
-class AutoResponder:
-    """Autonomous LLM response generator for prompt optimization experiments."""
+try:
+    from watchfiles import Change, watch
+except ImportError:
+    # watchfiles is optional - fall back to polling the request directory
+    Change = watch = None
 
-    def __init__(self, base_dir: Optional[Path] = None):
-        self.base_dir = base_dir or Path.cwd() / ".pr-faq-validator"
-        self.request_dir = self.base_dir / "llm_requests"
-        self.response_dir = self.base_dir / "llm_responses"
-        self.processed_requests: set[str] = set()
+log = logging.getLogger(__name__)
 
-        # Ensure directories exist
-        self.request_dir.mkdir(parents=True, exist_ok=True)
-        self.response_dir.mkdir(parents=True, exist_ok=True)
 
-        print("=" * 80, flush=True)
-        print("AUTO-RESPONDER VERSION 4.0 - Prompt-Aware Content Generation", flush=True)
-        print("=" * 80, flush=True)
+# Leading prompt characters (after the system prompt) that identify a reusable prompt prefix
+_PROMPT_CACHE_PREFIX_CHARS = 512
 
-    def detect_request_type(self, request_data: Dict[str, Any]) -> str:
-        """Detect the type of request based on prompt content."""
-        print("    [DEBUG-V4] detect_request_type called - VERSION 4.0", flush=True)
-        prompt = request_data.get("prompt", "")
-        system_prompt = request_data.get("system_prompt") or ""
-        request_id = request_data.get("request_id", "unknown")
+# Instruction keywords marking prompt mutation requests (checked before evaluation)
+_MUTATION_KEYWORDS = (
+    "suggest an improved version",
+    "optimizing llm prompts",
+    "improved prompt text",
+    "provide only the improved prompt",
+    "expert at optimizing",
+)
 
-        print(f"    [DEBUG-V4] Prompt first 150 chars: {repr(prompt[:150])}", flush=True)
-        print(f"    [DEBUG-V4] Has 'Current prompt:': {'Current prompt:' in prompt}", flush=True)
-        print(f"    [DEBUG-V4] Has 'current prompt:': {'current prompt:' in prompt}", flush=True)
+# Instruction keywords marking evaluation requests
+_EVAL_KEYWORDS = (
+    "evaluate",
+    "score",
+    "assessment",
+    "press_release_quality",
+    "faq_completeness",
+    "clarity_score",
+)
 
-        # For mutation detection, only check the INSTRUCTION part (before "Current prompt:" or "current prompt:")
-        # to avoid false matches in the embedded prompt content
-        if "Current prompt:" in prompt:
-            instruction_part = prompt.split("Current prompt:")[0]
-            print(
-                f"    [DEBUG-V4] Split on 'Current prompt:' - instruction length: {len(instruction_part)}", flush=True
-            )
-        elif "current prompt:" in prompt:
-            instruction_part = prompt.split("current prompt:")[0]
-            print(
-                f"    [DEBUG-V4] Split on 'current prompt:' - instruction length: {len(instruction_part)}", flush=True
-            )
-        else:
-            instruction_part = prompt
-            print("    [DEBUG-V4] No split - using full prompt", flush=True)
+# Content quality indicators extracted from PR-FAQ text by generate_evaluation
+_IMPROVEMENT_PCT_RE = re.compile(r"(\d+)% improvement")
+_DOLLAR_AMOUNT_RE = re.compile(r"\$[\d,]+")
+_TIME_SAVINGS_RE = re.compile(r"\d+\.?\d* hours?")
+_SPECIFIC_METRICS_RE = re.compile(r"\d+,\d+ (transactions|users|concurrent)")
+_ACCURACY_RE = re.compile(r"\d+\.\d+% accuracy")
 
-        instruction_lower = instruction_part.lower()
-        system_lower = system_prompt.lower()
 
-        print(
-            f"    [DEBUG] Request {request_id}: Prompt length = {len(prompt)}, "
-            f"instruction length = {len(instruction_part)}",
-            flush=True,
-        )
+@lru_cache(maxsize=256)
+def _prompt_hash(prompt: str) -> int:
+    """Deterministic integer hash of a prompt, used to vary generated quality."""
+    return int.from_bytes(hashlib.blake2b(prompt.encode(), digest_size=8).digest(), "big")
 
-        # Mutation/optimization requests (check FIRST before evaluation)
-        # These ask for improved prompts, not evaluations
-        mutation_keywords = [
-            "suggest an improved version",
-            "optimizing llm prompts",
-            "improved prompt text",
-            "provide only the improved prompt",
-            "expert at optimizing",
-        ]
-        found_mutation = [k for k in mutation_keywords if k in instruction_lower]
-        print(
-            f"    [DEBUG] Request {request_id}: Checking mutation keywords in instruction... found: {found_mutation}",
-            flush=True,
-        )
-        if found_mutation:
-            print(f"    [DEBUG] Request {request_id}: RETURNING mutation", flush=True)
-            return "mutation"
 
-        # Evaluation requests contain specific keywords
-        eval_keywords = [
-            "evaluate",
-            "score",
-            "assessment",
-            "press_release_quality",
-            "faq_completeness",
-            "clarity_score",
-        ]
-        found_eval = [k for k in eval_keywords if k in instruction_lower]
-        if found_eval:
-            print(
-                f"    [DEBUG] Request {request_id}: Found evaluation keywords in instruction: {found_eval[:2]}",
-                flush=True,
-            )
-            return "evaluation"
+@lru_cache(maxsize=256)
+def _word_count(text: str) -> int:
+    """Whitespace token count of a prompt, used as the mock token estimate."""
+    return len(text.split())
 
-        # Press release generation (check instruction part only)
-        if "press release" in instruction_lower or "press release" in system_lower:
-            return "press_release"
 
-        # FAQ generation (check instruction part only)
-        if "faq" in instruction_lower or "frequently asked" in instruction_lower:
-            return "faq"
+def _prompt_cache_key(system_prompt: str, prompt: str) -> str:
+    """Stable key for the shared prompt prefix, for backends with server-side prompt caching."""
+    prefix = system_prompt + prompt[:_PROMPT_CACHE_PREFIX_CHARS]
+    return hashlib.blake2b(prefix.encode(), digest_size=16).hexdigest()
 
-        return "generic"
 
-    def generate_press_release(self, request_data: Dict[str, Any]) -> str:
-        """Generate varied press release based on prompt requirements."""
-        request_id = request_data.get("request_id", 0)
-        prompt = request_data.get("prompt", "")
-        prompt_lower = prompt.lower()
-        seed = hashlib.md5(str(request_id).encode()).hexdigest()[:8]
-
-        # Use prompt hash to create deterministic but varied outputs for different prompts
-        # This ensures that improved prompts generate different (hopefully better) content
-        prompt_hash = int(hashlib.md5(prompt.encode()).hexdigest()[:16], 16)
-        quality_score = (prompt_hash % 100) / 100.0  # 0.00 to 0.99
-
-        # Extract key requirements from prompt to vary the output
-        has_specificity = "specific" in prompt_lower or "quantitative" in prompt_lower or "measurable" in prompt_lower
-        has_evidence = "evidence" in prompt_lower or "credibility" in prompt_lower or "validation" in prompt_lower
-        has_customer_focus = "customer" in prompt_lower or "stakeholder" in prompt_lower
-        has_metrics = "metric" in prompt_lower or "number" in prompt_lower or "percentage" in prompt_lower
-
-        # Boost quality score based on prompt requirements
-        if has_evidence:
-            quality_score += 0.15
-        if has_specificity:
-            quality_score += 0.10
-        if has_metrics:
-            quality_score += 0.10
-        if has_customer_focus:
-            quality_score += 0.05
-
-        # Cap at 1.0
-        quality_score = min(quality_score, 1.0)
-
-        print(
-            f"    [DEBUG-V4-PR] Request {request_id}: quality_score={quality_score:.2f}, "
-            f"has_evidence={has_evidence}, has_specificity={has_specificity}, has_metrics={has_metrics}"
-        )
+def _write_json(path: Path, data: Dict[str, Any], pretty: bool = False) -> None:
+    """Atomically write a JSON file.
 
-        # Generate content based on quality score
-        variation = int(quality_score * 10) % 3  # 0, 1, or 2
-
-        # Generate content with quality proportional to quality_score
-        if quality_score >= 0.8:
-            # Highest quality PR with strong evidence and specific metrics
-            if variation == 0:
-                metrics = f"{int(45 + quality_score * 10)}% improvement"
-                customer_quote = (
-                    '"This solution reduced our processing time from 8 hours to 3.8 hours '
-                    'per day, saving our team $147,000 annually," said Sarah Chen, '
-                    'Operations Director at TechCorp. "The ROI was evident within the first quarter."'
-                )
-                specifics = (
-                    "The platform processes 18,000 transactions per hour with 99.98% accuracy, "
-                    "handling peak loads of 65,000 concurrent users across 12 geographic regions."
-                )
-            elif variation == 1:
-                metrics = f"{int(43 + quality_score * 10)}% improvement"
-                customer_quote = (
-                    '"We achieved a 4.2-hour reduction in daily processing time, '
-                    'translating to $127,000 in annual savings," said Michael Rodriguez, VP of Operations.'
-                )
-                specifics = (
-                    "The platform processes 15,000 transactions per hour with 99.97% accuracy, "
-                    "handling peak loads of 50,000 concurrent users."
-                )
-            else:
-                metrics = f"{int(42 + quality_score * 10)}% improvement"
-                customer_quote = (
-                    '"Processing time dropped from 8 to 4.5 hours daily, saving $115,000 per year," '
-                    'said Jennifer Park, Director of Engineering.'
-                )
-                specifics = (
-                    "The system handles 14,000 transactions per hour with 99.95% accuracy "
-                    "and supports 45,000 concurrent users."
-                )
-        elif quality_score >= 0.6:
-            # Good PR with metrics but less evidence
-            metrics = f"{int(30 + quality_score * 15)}% improvement"
-            customer_quote = (
-                '"We\'ve seen measurable productivity gains in our workflows," '
-                'said Product Leader. "The metrics speak for themselves."'
-            )
-            specifics = (
-                "The solution integrates with existing tools and provides "
-                "real-time analytics with sub-second response times."
-            )
-        elif quality_score >= 0.4:
-            # Moderate PR with some customer focus
-            metrics = f"{int(25 + quality_score * 15)}% improvement"
-            customer_quote = '"This addresses what our customers have been asking for," said Customer Success Lead.'
-            specifics = "Built based on feedback from customer interviews and beta testing."
-        else:
-            # Basic PR with minimal specifics
-            metrics = f"{int(20 + quality_score * 20)}% improvement"
-            customer_quote = '"This represents progress in our capabilities," said Team Lead.'
-            specifics = "The solution provides automation features."
+    Clients poll for the file to appear, so it must never be visible half-written.
+    """
+    payload = dumps_json(data, pretty)
 
-        return f"""# Revolutionary Product Launch
+    tmp_name = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+            tmp_name = f.name
+            f.write(payload)
+        os.replace(tmp_name, path)
+    except OSError:
+        if tmp_name and os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def _is_request_change(change: Any, path: str) -> bool:
+    """Filter watchfiles events down to created/updated request files."""
+    name = Path(path).name
+    return change != Change.deleted and name.startswith("request_") and name.endswith(".json")
+
+
+# Per-dimension (name, low, high) jitter applied around the evaluation base score.
+# Draw order matters: scores are seeded by request_id and must stay reproducible.
+_SCORE_JITTER = (
+    ("press_release_quality", -0.2, 0.3),
+    ("faq_completeness", -0.3, 0.2),
+    ("clarity_score", -0.2, 0.2),
+    ("structure_adherence", -0.1, 0.2),
+)
+_CONTENT_QUALITY_JITTER = (
+    ("clarity", -0.2, 0.2),
+    ("depth", -0.1, 0.3),
+    ("nuance", -0.3, 0.2),
+    ("specificity", -0.4, 0.1),
+)
+
+# Top-tier (quality >= 0.8) press release content, picked by variation: (metric base, customer quote, specifics)
+_PR_TOP_TIER_VARIANTS = (
+    (
+        45,
+        '"This solution reduced our processing time from 8 hours to 3.8 hours '
+        'per day, saving our team $147,000 annually," said Sarah Chen, '
+        'Operations Director at TechCorp. "The ROI was evident within the first quarter."',
+        "The platform processes 18,000 transactions per hour with 99.98% accuracy, "
+        "handling peak loads of 65,000 concurrent users across 12 geographic regions.",
+    ),
+    (
+        43,
+        '"We achieved a 4.2-hour reduction in daily processing time, '
+        'translating to $127,000 in annual savings," said Michael Rodriguez, VP of Operations.',
+        "The platform processes 15,000 transactions per hour with 99.97% accuracy, "
+        "handling peak loads of 50,000 concurrent users.",
+    ),
+    (
+        42,
+        '"Processing time dropped from 8 to 4.5 hours daily, saving $115,000 per year," '
+        "said Jennifer Park, Director of Engineering.",
+        "The system handles 14,000 transactions per hour with 99.95% accuracy "
+        "and supports 45,000 concurrent users.",
+    ),
+)
+
+# Lower press release tiers, best first: (min quality, metric base, metric scale, customer quote, specifics)
+_PR_TIERS = (
+    # Good PR with metrics but less evidence
+    (
+        0.6,
+        30,
+        15,
+        '"We\'ve seen measurable productivity gains in our workflows," '
+        'said Product Leader. "The metrics speak for themselves."',
+        "The solution integrates with existing tools and provides "
+        "real-time analytics with sub-second response times.",
+    ),
+    # Moderate PR with some customer focus
+    (
+        0.4,
+        25,
+        15,
+        '"This addresses what our customers have been asking for," said Customer Success Lead.',
+        "Built based on feedback from customer interviews and beta testing.",
+    ),
+    # Basic PR with minimal specifics
+    (
+        0.0,
+        20,
+        20,
+        '"This represents progress in our capabilities," said Team Lead.',
+        "The solution provides automation features.",
+    ),
+)
+
+_PRESS_RELEASE_TEMPLATE = string.Template(
+    """# Revolutionary Product Launch
 
 **FOR IMMEDIATE RELEASE**
 
 ## New Solution Transforms Industry Landscape
 
-SEATTLE, WA - Today marks a significant milestone with the launch of an innovative solution that addresses critical customer challenges. This groundbreaking approach delivers measurable value through automation and intelligent design.
+SEATTLE, WA - Today marks a significant milestone with the launch of an innovative solution that \
+addresses critical customer challenges. This groundbreaking approach delivers measurable value \
+through automation and intelligent design.
 
-{customer_quote}
+${customer_quote}
 
 The solution provides three core benefits:
-- **{metrics}** in workflow efficiency through intelligent automation
+- **${metrics}** in workflow efficiency through intelligent automation
 - **Enhanced user experience** with intuitive, data-driven design
 - **25% cost reduction** through optimized resource allocation
 
-{specifics}
+${specifics}
 
-Early customer feedback has been overwhelmingly positive. Beta testers report significant improvements in productivity and quality metrics.
+Early customer feedback has been overwhelmingly positive. Beta testers report significant \
+improvements in productivity and quality metrics.
 
 ### Key Features
 
@@ -247,58 +224,48 @@ For more information, visit our website or contact our team.
 We are committed to innovation, customer success, and delivering measurable business value.
 
 **Contact:** press@company.com
-
-(Seed: {seed})
 """
+)
 
-    def generate_faq(self, request_data: Dict[str, Any]) -> str:
-        """Generate varied FAQ based on prompt requirements."""
-        request_id = request_data.get("request_id", 0)
-        prompt = request_data.get("prompt", "").lower()
-        seed = hashlib.md5(str(request_id).encode()).hexdigest()[:8]
-
-        # Extract key requirements from prompt to vary the output
-        has_comprehensive = "comprehensive" in prompt or "detailed" in prompt
-        has_stakeholder = "stakeholder" in prompt or "concern" in prompt
-        has_technical = "technical" in prompt or "implementation" in prompt
-
-        # Build FAQ sections based on prompt emphasis
-        technical_section = ""
-        if has_technical:
-            technical_section = """
+# Optional FAQ sections, included when the prompt emphasizes them
+_FAQ_TECHNICAL_SECTION = """
 
 ## Q: What are the technical requirements?
 
-A: The solution requires minimal infrastructure changes. It integrates via REST API with existing systems, supports OAuth 2.0 authentication, and runs on standard cloud platforms (AWS, Azure, GCP). Average implementation time is 2-3 weeks for most organizations.
+A: The solution requires minimal infrastructure changes. It integrates via REST API with existing \
+systems, supports OAuth 2.0 authentication, and runs on standard cloud platforms (AWS, Azure, \
+GCP). Average implementation time is 2-3 weeks for most organizations.
 """
 
-        stakeholder_section = ""
-        if has_stakeholder:
-            stakeholder_section = """
+_FAQ_STAKEHOLDER_SECTION = """
 
 ## Q: How does this address stakeholder concerns about cost?
 
-A: The solution pays for itself within 6 months through efficiency gains. Organizations save an average of $150,000 annually through reduced manual processing time and error correction costs. We offer flexible pricing tiers to match different organization sizes.
+A: The solution pays for itself within 6 months through efficiency gains. Organizations save an \
+average of $150,000 annually through reduced manual processing time and error correction costs. We \
+offer flexible pricing tiers to match different organization sizes.
 """
 
-        comprehensive_detail = "15 hours per week" if has_comprehensive else "significant time"
-        reduction_detail = "60%" if has_comprehensive else "substantially"
-
-        return f"""# Frequently Asked Questions
+_FAQ_TEMPLATE = string.Template(
+    """# Frequently Asked Questions
 
 ## Q: What specific problem does this solve?
 
 A: This solution addresses the core challenge of inefficiency in current workflows by providing \
-automated, intelligent assistance. Teams spend an average of {comprehensive_detail} on manual \
-tasks that can be automated, and this solution reduces that by {reduction_detail}.
+automated, intelligent assistance. Teams spend an average of ${comprehensive_detail} on manual \
+tasks that can be automated, and this solution reduces that by ${reduction_detail}.
 
 ## Q: Who is this designed for?
 
-A: This is built for engineering teams, product managers, and technical leaders who need to streamline their processes and improve productivity. It's particularly valuable for teams managing complex projects with multiple stakeholders.
+A: This is built for engineering teams, product managers, and technical leaders who need to \
+streamline their processes and improve productivity. It's particularly valuable for teams managing \
+complex projects with multiple stakeholders.
 
 ## Q: How does the system work?
 
-A: The platform uses advanced algorithms to analyze inputs, identify patterns, and generate optimized outputs based on industry best practices. It integrates seamlessly with existing tools via APIs and webhooks.
+A: The platform uses advanced algorithms to analyze inputs, identify patterns, and generate \
+optimized outputs based on industry best practices. It integrates seamlessly with existing tools \
+via APIs and webhooks.
 
 ## Q: What are the measurable benefits?
 
@@ -307,144 +274,60 @@ A: Users can expect:
 - 30% higher quality scores in peer reviews
 - 50% reduction in manual rework
 - 25% improvement in team satisfaction scores
-{technical_section}{stakeholder_section}
+${technical_section}${stakeholder_section}
 
 ## Q: When will this be available?
 
-A: The solution is currently in beta with select customers and will be generally available in Q2 2025. Early access programs are available for qualified teams.
+A: The solution is currently in beta with select customers and will be generally available in Q2 \
+2025. Early access programs are available for qualified teams.
 
 ## Q: What is the pricing model?
 
-A: Pricing starts at $99/user/month for teams of 10+, with volume discounts available. Enterprise pricing includes dedicated support and custom integrations.
+A: Pricing starts at $$99/user/month for teams of 10+, with volume discounts available. Enterprise \
+pricing includes dedicated support and custom integrations.
 
 ## Q: What support and training is provided?
 
-A: Comprehensive documentation, video tutorials, live training sessions, and dedicated support channels are included. Enterprise customers receive a dedicated customer success manager.
+A: Comprehensive documentation, video tutorials, live training sessions, and dedicated support \
+channels are included. Enterprise customers receive a dedicated customer success manager.
 
 ## Q: How does this integrate with our existing tools?
 
-A: The platform offers native integrations with popular tools (Jira, GitHub, Slack, etc.) and a robust REST API for custom integrations.
-
-(Seed: {seed})
+A: The platform offers native integrations with popular tools (Jira, GitHub, Slack, etc.) and a \
+robust REST API for custom integrations.
 """
-
-    def generate_evaluation(self, request_data: Dict[str, Any]) -> str:
-        """Generate evaluation based on actual content quality."""
-        request_id = request_data.get("request_id", 0)
-        prompt = request_data.get("prompt", "")
-
-        # Extract content quality indicators from the PR-FAQ content
-        # pylint: disable=import-outside-toplevel
-        import re  # noqa: E402
-
-        # Extract improvement percentage
-        percentage_match = re.search(r"(\d+)% improvement", prompt)
-        improvement_pct = int(percentage_match.group(1)) if percentage_match else 30
-
-        # Check for quantitative metrics in customer quotes
-        has_dollar_amount = bool(re.search(r"\$[\d,]+", prompt))
-        has_time_savings = bool(re.search(r"\d+\.?\d* hours?", prompt))
-        has_specific_metrics = bool(re.search(r"\d+,\d+ (transactions|users|concurrent)", prompt))
-        has_accuracy = bool(re.search(r"\d+\.\d+% accuracy", prompt))
-
-        # Calculate base score from content quality (3.5-4.8 range)
-        # Higher improvement percentage = higher score
-        base_score = 3.5 + (improvement_pct / 100.0) * 1.3  # 30% → 3.89, 50% → 4.15
-
-        # Boost for quantitative evidence
-        if has_dollar_amount:
-            base_score += 0.15
-        if has_time_savings:
-            base_score += 0.10
-        if has_specific_metrics:
-            base_score += 0.15
-        if has_accuracy:
-            base_score += 0.10
-
-        # Cap at 4.8
-        base_score = min(base_score, 4.8)
-
-        # Use request_id for minor variation to avoid identical scores
-        random.seed(request_id)
-        variation = random.uniform(-0.05, 0.05)
-        base_score += variation
-
-        print(
-            f"    [DEBUG-V4-EVAL] Request {request_id}: improvement={improvement_pct}%, "
-            f"$={has_dollar_amount}, time={has_time_savings}, metrics={has_specific_metrics}, "
-            f"accuracy={has_accuracy}, base_score={base_score:.2f}"
-        )
-
-        evaluation = {
-            "overall_score": round(base_score, 2),
-            "press_release_quality": round(base_score + random.uniform(-0.2, 0.3), 2),
-            "faq_completeness": round(base_score + random.uniform(-0.3, 0.2), 2),
-            "clarity_score": round(base_score + random.uniform(-0.2, 0.2), 2),
-            "structure_adherence": round(base_score + random.uniform(-0.1, 0.2), 2),
-            "content_quality": {
-                "clarity": round(base_score + random.uniform(-0.2, 0.2), 2),
-                "depth": round(base_score + random.uniform(-0.1, 0.3), 2),
-                "nuance": round(base_score + random.uniform(-0.3, 0.2), 2),
-                "specificity": round(base_score + random.uniform(-0.4, 0.1), 2),
-            },
-            "slop_violations": {"critical": [], "high": [], "medium": [], "low": []},
-            "voice_analysis": {
-                "authenticity_score": round(base_score, 2),
-                "strengths": [
-                    "Direct, concrete language",
-                    "Specific metrics and examples",
-                    "Clear problem-solution framing",
-                ],
-                "concerns": [],
-            },
-            "feedback": f"Score: {base_score:.2f}/5.0. Content demonstrates good clarity and practical focus. "
-            f"Could benefit from more specific examples and quantitative data.",
-            "strengths": [
-                "Clear problem statement",
-                "Well-structured content",
-                "Comprehensive FAQ coverage",
-                "Specific metrics included",
-            ],
-            "improvements": [
-                "Add more concrete customer quotes",
-                "Include specific technical details",
-                "Expand on implementation timeline",
-                "Provide more quantitative evidence",
-            ],
-            "evolutionary_strategy": {
-                "prompt_to_modify": random.choice(["press_release", "faq", "refinement"]),
-                "specific_changes": [
-                    {
-                        "section": "introduction",
-                        "current_issue": "Lacks specific quantitative metrics",
-                        "proposed_change": "Add concrete numbers and percentages to claims",
-                        "rationale": "Specificity scores are lowest dimension",
-                    },
-                    {
-                        "section": "benefits",
-                        "current_issue": "Generic benefit statements",
-                        "proposed_change": "Include customer quotes with measurable outcomes",
-                        "rationale": "Voice authenticity needs concrete evidence",
-                    },
-                ],
-                "priority": "high",
-                "expected_impact": "Improve specificity score by 0.3-0.5 points",
-            },
-        }
-
-        return json.dumps(evaluation, indent=2)
-
-    def generate_mutation(self, request_data: Dict[str, Any]) -> str:
-        """Generate an improved/mutated version of a prompt."""
-        request_id = request_data.get("request_id", 0)
-
-        # Note: We could extract the current prompt from the mutation request
-        # but we use predefined variations instead for consistency
-
-        # Generate variations based on request_id for diversity
-        variations = [
-            # Variation 1: Add more specificity requirements
-            """Generate a comprehensive PR-FAQ document following Amazon's format \
+)
+
+# Fixed evaluation text; tuples serialize as JSON arrays
+_EVAL_FEEDBACK = (
+    "Score: %.2f/5.0. Content demonstrates good clarity and practical focus. "
+    "Could benefit from more specific examples and quantitative data."
+)
+_VOICE_STRENGTHS = (
+    "Direct, concrete language",
+    "Specific metrics and examples",
+    "Clear problem-solution framing",
+)
+_EVAL_STRENGTHS = (
+    "Clear problem statement",
+    "Well-structured content",
+    "Comprehensive FAQ coverage",
+    "Specific metrics included",
+)
+_EVAL_IMPROVEMENTS = (
+    "Add more concrete customer quotes",
+    "Include specific technical details",
+    "Expand on implementation timeline",
+    "Provide more quantitative evidence",
+)
+
+# Trailing per-request line appended to generated press releases and FAQs
+_SEED_LINE = "\n(Seed: %s)\n"
+
+# Prompt rewrites returned for mutation requests, chosen by request_id
+_MUTATION_VARIATIONS = (
+    # Variation 1: Add more specificity requirements
+    """Generate a comprehensive PR-FAQ document following Amazon's format \
 with strong emphasis on quantitative specificity and measurable outcomes.
 
 Project: {projectName}
@@ -510,8 +393,8 @@ QUALITY STANDARDS:
 Create a press release and FAQ that clearly articulates the customer problem, \
 solution, and benefits with maximum specificity, measurable outcomes, \
 and quantitative evidence.""",
-            # Variation 2: Emphasize customer-centricity
-            """Generate a customer-focused PR-FAQ document following Amazon's \
+    # Variation 2: Emphasize customer-centricity
+    """Generate a customer-focused PR-FAQ document following Amazon's \
 working backwards methodology with emphasis on measurable customer outcomes.
 
 Project: {projectName}
@@ -574,8 +457,8 @@ QUALITY REQUIREMENTS:
 
 Generate a compelling PR-FAQ that demonstrates clear customer value \
 with quantitative evidence and measurable outcomes.""",
-            # Variation 3: Focus on credibility and evidence
-            """Generate an evidence-based PR-FAQ document following Amazon's format \
+    # Variation 3: Focus on credibility and evidence
+    """Generate an evidence-based PR-FAQ document following Amazon's format \
 with emphasis on credibility, specificity, and quantitative validation.
 
 Project: {projectName}
@@ -640,39 +523,276 @@ CREDIBILITY STANDARDS:
 
 Create a credible, evidence-based PR-FAQ that builds trust through specificity, \
 quantitative validation, and measurable customer outcomes.""",
-        ]
+)
+
+
+@lru_cache(maxsize=256)
+def _render_press_release(prompt: str) -> str:
+    """Render a press release body, without the per-request seed line."""
+    prompt_lower = prompt.lower()
+
+    # Use prompt hash to create deterministic but varied outputs for different prompts
+    # This ensures that improved prompts generate different (hopefully better) content
+    prompt_hash = _prompt_hash(prompt)
+    quality_score = (((prompt_hash & 0xFFFF) * 100) >> 16) / 100.0  # 0.00 to 0.99, from the low 16 bits
+
+    # Extract key requirements from prompt to vary the output
+    has_specificity = "specific" in prompt_lower or "quantitative" in prompt_lower or "measurable" in prompt_lower
+    has_evidence = "evidence" in prompt_lower or "credibility" in prompt_lower or "validation" in prompt_lower
+    has_customer_focus = "customer" in prompt_lower or "stakeholder" in prompt_lower
+    has_metrics = "metric" in prompt_lower or "number" in prompt_lower or "percentage" in prompt_lower
+
+    # Boost quality score based on prompt requirements
+    if has_evidence:
+        quality_score += 0.15
+    if has_specificity:
+        quality_score += 0.10
+    if has_metrics:
+        quality_score += 0.10
+    if has_customer_focus:
+        quality_score += 0.05
+
+    # Cap at 1.0
+    quality_score = min(quality_score, 1.0)
+
+    log.debug(
+        "Press release quality_score=%.2f, has_evidence=%s, has_specificity=%s, has_metrics=%s",
+        quality_score,
+        has_evidence,
+        has_specificity,
+        has_metrics,
+    )
+
+    # Generate content based on quality score
+    variation = int(quality_score * 10) % 3  # 0, 1, or 2
+
+    # Generate content with quality proportional to quality_score
+    if quality_score >= 0.8:
+        # Highest quality PR with strong evidence and specific metrics
+        metric_base, customer_quote, specifics = _PR_TOP_TIER_VARIANTS[variation]
+        metric_scale = 10
+    else:
+        _, metric_base, metric_scale, customer_quote, specifics = next(t for t in _PR_TIERS if quality_score >= t[0])
+    metrics = f"{int(metric_base + quality_score * metric_scale)}% improvement"
+
+    return _PRESS_RELEASE_TEMPLATE.substitute(customer_quote=customer_quote, metrics=metrics, specifics=specifics)
+
+
+@lru_cache(maxsize=256)
+def _render_faq(prompt: str) -> str:
+    """Render an FAQ body, without the per-request seed line."""
+    prompt = prompt.lower()
+
+    # Extract key requirements from prompt to vary the output
+    has_comprehensive = "comprehensive" in prompt or "detailed" in prompt
+    has_stakeholder = "stakeholder" in prompt or "concern" in prompt
+    has_technical = "technical" in prompt or "implementation" in prompt
+
+    return _FAQ_TEMPLATE.substitute(
+        comprehensive_detail="15 hours per week" if has_comprehensive else "significant time",
+        reduction_detail="60%" if has_comprehensive else "substantially",
+        technical_section=_FAQ_TECHNICAL_SECTION if has_technical else "",
+        stakeholder_section=_FAQ_STAKEHOLDER_SECTION if has_stakeholder else "",
+    )
 
-        # Select variation based on request_id
-        variation_index = request_id % len(variations)
-        return variations[variation_index]
 
-    def generate_response(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate appropriate response based on request type."""
+class AutoResponder:
+    """Autonomous LLM response generator for prompt optimization experiments."""
+
+    def __init__(self, base_dir: Optional[Path] = None, pretty: bool = False):
+        self.pretty = pretty
+        self.base_dir = base_dir or Path.cwd() / ".pr-faq-validator"
+        self.request_dir = self.base_dir / "llm_requests"
+        self.response_dir = self.base_dir / "llm_responses"
+        # Answered requests are moved here so the request directory only holds pending work
+        self.processed_dir = self.request_dir / "processed"
+        self.generators: Dict[str, Callable[[int, str], str]] = {
+            "mutation": self.generate_mutation,
+            "evaluation": self.generate_evaluation,
+            "press_release": self.generate_press_release,
+            "faq": self.generate_faq,
+        }
+
+        # Ensure directories exist
+        self.request_dir.mkdir(parents=True, exist_ok=True)
+        self.response_dir.mkdir(parents=True, exist_ok=True)
+        self.processed_dir.mkdir(exist_ok=True)
+
+        print("=" * 80, flush=True)
+        print("AUTO-RESPONDER VERSION 4.0 - Prompt-Aware Content Generation", flush=True)
+        print("=" * 80, flush=True)
+
+    def detect_request_type(self, request_data: Dict[str, Any]) -> str:
+        """Detect the type of request based on prompt content."""
+        prompt = request_data.get("prompt", "")
+        system_prompt = request_data.get("system_prompt") or ""
         request_id = request_data.get("request_id", "unknown")
-        request_type = self.detect_request_type(request_data)
-
-        print(f"    [DEBUG] Request {request_id}: Detected type = {request_type}", flush=True)
-
-        if request_type == "mutation":
-            content = self.generate_mutation(request_data)
-            print(f"    [DEBUG] Request {request_id}: Generated mutation ({len(content)} chars)", flush=True)
-            print(f"    [DEBUG] Request {request_id}: Content starts with: {content[:80]}", flush=True)
-        elif request_type == "evaluation":
-            content = self.generate_evaluation(request_data)
-            print(f"    [DEBUG] Request {request_id}: Generated evaluation ({len(content)} chars)", flush=True)
-            print(f"    [DEBUG] Request {request_id}: Content starts with: {content[:80]}", flush=True)
-        elif request_type == "press_release":
-            content = self.generate_press_release(request_data)
-            print(f"    [DEBUG] Request {request_id}: Generated press_release ({len(content)} chars)", flush=True)
-        elif request_type == "faq":
-            content = self.generate_faq(request_data)
-            print(f"    [DEBUG] Request {request_id}: Generated faq ({len(content)} chars)", flush=True)
+
+        log.debug("Request %s: prompt first 150 chars: %r", request_id, prompt[:150])
+
+        # For mutation detection, only check the INSTRUCTION part (before "Current prompt:" or "current prompt:")
+        # to avoid false matches in the embedded prompt content
+        split_at = prompt.find("Current prompt:")
+        if split_at < 0:
+            split_at = prompt.find("current prompt:")
+        if split_at >= 0:
+            instruction_part = prompt[:split_at]
+            log.debug("Request %s: split on %r", request_id, prompt[split_at : split_at + 15])
         else:
-            content = f"Generic response for request {request_data.get('request_id')}"
-            print(f"    [DEBUG] Request {request_id}: Generated generic ({len(content)} chars)", flush=True)
+            instruction_part = prompt
+            log.debug("Request %s: no split - using full prompt", request_id)
+
+        instruction_lower = instruction_part.lower()
+        system_lower = system_prompt.lower()
+
+        log.debug(
+            "Request %s: prompt length = %d, instruction length = %d", request_id, len(prompt), len(instruction_part)
+        )
+
+        # Mutation/optimization requests (check FIRST before evaluation)
+        # These ask for improved prompts, not evaluations
+        if any(k in instruction_lower for k in _MUTATION_KEYWORDS):
+            log.debug("Request %s: found mutation keywords in instruction", request_id)
+            return "mutation"
+
+        # Evaluation requests contain specific keywords
+        if any(k in instruction_lower for k in _EVAL_KEYWORDS):
+            log.debug("Request %s: found evaluation keywords in instruction", request_id)
+            return "evaluation"
+
+        # Press release generation (check instruction part only)
+        if "press release" in instruction_lower or "press release" in system_lower:
+            return "press_release"
+
+        # FAQ generation (check instruction part only)
+        if "faq" in instruction_lower or "frequently asked" in instruction_lower:
+            return "faq"
+
+        return "generic"
+
+    def generate_press_release(self, request_id: int, prompt: str) -> str:
+        """Generate varied press release based on prompt requirements."""
+        return _render_press_release(prompt) + _SEED_LINE % f"{request_id:08x}"
+
+    def generate_faq(self, request_id: int, prompt: str) -> str:
+        """Generate varied FAQ based on prompt requirements."""
+        return _render_faq(prompt) + _SEED_LINE % f"{request_id:08x}"
+
+    def generate_evaluation(self, request_id: int, prompt: str) -> str:
+        """Generate evaluation based on actual content quality."""
+        # Extract improvement percentage
+        percentage_match = _IMPROVEMENT_PCT_RE.search(prompt)
+        improvement_pct = int(percentage_match.group(1)) if percentage_match else 30
+
+        # Check for quantitative metrics in customer quotes
+        has_dollar_amount = bool(_DOLLAR_AMOUNT_RE.search(prompt))
+        has_time_savings = bool(_TIME_SAVINGS_RE.search(prompt))
+        has_specific_metrics = bool(_SPECIFIC_METRICS_RE.search(prompt))
+        has_accuracy = bool(_ACCURACY_RE.search(prompt))
+
+        # Calculate base score from content quality (3.5-4.8 range)
+        # Higher improvement percentage = higher score
+        base_score = 3.5 + (improvement_pct / 100.0) * 1.3  # 30% → 3.89, 50% → 4.15
+
+        # Boost for quantitative evidence
+        if has_dollar_amount:
+            base_score += 0.15
+        if has_time_savings:
+            base_score += 0.10
+        if has_specific_metrics:
+            base_score += 0.15
+        if has_accuracy:
+            base_score += 0.10
+
+        # Cap at 4.8
+        base_score = min(base_score, 4.8)
+
+        # Use request_id for minor variation to avoid identical scores
+        rng = random.Random(request_id)
+        uniform = rng.uniform
+        variation = uniform(-0.05, 0.05)
+        base_score += variation
+
+        log.debug(
+            "Request %s: improvement=%s%%, $=%s, time=%s, metrics=%s, accuracy=%s, base_score=%.2f",
+            request_id,
+            improvement_pct,
+            has_dollar_amount,
+            has_time_savings,
+            has_specific_metrics,
+            has_accuracy,
+            base_score,
+        )
+
+        evaluation = {
+            "overall_score": round(base_score, 2),
+            **{name: round(base_score + uniform(low, high), 2) for name, low, high in _SCORE_JITTER},
+            "content_quality": {
+                name: round(base_score + uniform(low, high), 2) for name, low, high in _CONTENT_QUALITY_JITTER
+            },
+            "slop_violations": {"critical": [], "high": [], "medium": [], "low": []},
+            "voice_analysis": {
+                "authenticity_score": round(base_score, 2),
+                "strengths": _VOICE_STRENGTHS,
+                "concerns": [],
+            },
+            "feedback": _EVAL_FEEDBACK % base_score,
+            "strengths": _EVAL_STRENGTHS,
+            "improvements": _EVAL_IMPROVEMENTS,
+            "evolutionary_strategy": {
+                "prompt_to_modify": rng.choice(["press_release", "faq", "refinement"]),
+                "specific_changes": [
+                    {
+                        "section": "introduction",
+                        "current_issue": "Lacks specific quantitative metrics",
+                        "proposed_change": "Add concrete numbers and percentages to claims",
+                        "rationale": "Specificity scores are lowest dimension",
+                    },
+                    {
+                        "section": "benefits",
+                        "current_issue": "Generic benefit statements",
+                        "proposed_change": "Include customer quotes with measurable outcomes",
+                        "rationale": "Voice authenticity needs concrete evidence",
+                    },
+                ],
+                "priority": "high",
+                "expected_impact": "Improve specificity score by 0.3-0.5 points",
+            },
+        }
+
+        return dumps_json(evaluation, self.pretty).decode("utf-8")
+
+    def generate_mutation(self, request_id: int, prompt: str) -> str:  # pylint: disable=unused-argument
+        """Generate an improved/mutated version of a prompt."""
+        # Predefined variations rather than rewriting the current prompt, for consistency
+        return _MUTATION_VARIATIONS[request_id % len(_MUTATION_VARIATIONS)]
+
+    def generate_generic(self, request_id: int, prompt: str) -> str:  # pylint: disable=unused-argument
+        """Generate a placeholder response for unrecognized requests."""
+        return f"Generic response for request {request_id}"
+
+    def generate_responses(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Generate responses for a batch of requests, in order."""
+        responses = []
+        for request_data in batch:
+            request_type = self.detect_request_type(request_data)
+            print(f"  Processing request {request_data.get('request_id')} (type: {request_type})", flush=True)
+            responses.append(self.generate_response(request_data, request_type))
+        return responses
+
+    def generate_response(self, request_data: Dict[str, Any], request_type: Optional[str] = None) -> Dict[str, Any]:
+        """Generate appropriate response based on request type (detected if not given)."""
+        request_id = request_data.get("request_id", 0)
+        prompt = request_data.get("prompt", "")
+        if request_type is None:
+            request_type = self.detect_request_type(request_data)
+
+        content = self.generators.get(request_type, self.generate_generic)(request_id, prompt)
+
+        log.debug("Request %s: generated %s (%d chars): %.80r", request_id, request_type, len(content), content)
 
         # Estimate token counts
-        prompt_tokens = len(request_data.get("prompt", "").split())
+        prompt_tokens = _word_count(prompt)
         completion_tokens = len(content.split())
 
         return {
@@ -680,71 +800,100 @@ quantitative validation, and measurable customer outcomes.""",
             "prompt_tokens": prompt_tokens,
             "completion_tokens": completion_tokens,
             "finish_reason": "stop",
+            "prompt_cache_key": _prompt_cache_key(request_data.get("system_prompt") or "", prompt),
         }
 
-    def process_requests(self, continuous: bool = False, sleep_interval: float = 1.0):
-        """Process pending requests."""
+    def process_requests(self, continuous: bool = False, sleep_interval: float = 1.0, poll: bool = False):
+        """Process pending requests, watching for new ones unless polling is forced or unavailable."""
         print("🔧 Auto-responder VERSION 3.0 - Instruction-only keyword detection", flush=True)
         print(f"Auto-responder monitoring: {self.request_dir}", flush=True)
         print(f"Responses will be written to: {self.response_dir}", flush=True)
 
-        iteration = 0
-        while True:
-            iteration += 1
-
-            # Find unprocessed requests
-            request_files = sorted(self.request_dir.glob("request_*.json"))
-            new_requests = [f for f in request_files if f.name not in self.processed_requests]
+        iteration = 1
+        self._process_pending(iteration)
 
-            if new_requests:
-                print(f"\n[Iteration {iteration}] Found {len(new_requests)} new request(s)", flush=True)
+        if not continuous:
+            return
 
-            for request_file in new_requests:
-                try:
-                    # Read request
-                    with open(request_file, "r", encoding="utf-8") as f:
-                        request_data = json.load(f)
+        if watch is not None and not poll:
+            print("Watching for new requests (filesystem notifications)", flush=True)
+            # yield_on_timeout rescans periodically in case an event was missed before the watch started
+            for _changes in watch(
+                self.request_dir, watch_filter=_is_request_change, recursive=False, yield_on_timeout=True
+            ):
+                iteration += 1
+                self._process_pending(iteration)
+            return
 
-                    request_id = request_data.get("request_id")
-                    request_type = self.detect_request_type(request_data)
+        print(f"Polling for new requests every {sleep_interval}s", flush=True)
+        while True:
+            time.sleep(sleep_interval)
+            iteration += 1
+            self._process_pending(iteration)
 
-                    print(f"  Processing request {request_id} (type: {request_type})", flush=True)
+    def _process_pending(self, iteration: int):
+        """Respond to every request file that has not been processed yet."""
+        # Anything still in the request directory has not been answered yet. Clients block on each
+        # response, so requests are independent and need no particular order.
+        with os.scandir(self.request_dir) as entries:
+            new_requests = [
+                Path(entry.path)
+                for entry in entries
+                if entry.name.startswith("request_") and entry.name.endswith(".json") and entry.is_file()
+            ]
 
-                    # Generate response
-                    response_data = self.generate_response(request_data)
+        if new_requests:
+            print(f"\n[Iteration {iteration}] Found {len(new_requests)} new request(s)", flush=True)
 
-                    # Write response
-                    response_file = self.response_dir / f"response_{request_id:04d}.json"
-                    with open(response_file, "w", encoding="utf-8") as f:
-                        json.dump(response_data, f, indent=2)
+        # Read every pending request first so responses are generated in one batch
+        batch = []
+        for request_file in new_requests:
+            try:
+                batch.append((request_file, load_json(request_file)))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"  ✗ Error processing {request_file.name}: {e}", flush=True)
 
-                    print(f"  ✓ Response written: {response_file.name}", flush=True)
+        responses = self.generate_responses([request_data for _, request_data in batch])
 
-                    # Mark as processed
-                    self.processed_requests.add(request_file.name)
+        for (request_file, request_data), response_data in zip(batch, responses):
+            try:
+                # Write response
+                response_file = self.response_dir / f"response_{request_data['request_id']:04d}.json"
+                _write_json(response_file, response_data, self.pretty)
 
-                except (OSError, json.JSONDecodeError, KeyError) as e:
-                    print(f"  ✗ Error processing {request_file.name}: {e}", flush=True)
+                print(f"  ✓ Response written: {response_file.name}", flush=True)
 
-            if not continuous:
-                break
+                # Mark as processed
+                request_file.replace(self.processed_dir / request_file.name)
 
-            time.sleep(sleep_interval)
+            except (OSError, KeyError) as e:
+                print(f"  ✗ Error processing {request_file.name}: {e}", flush=True)
 
 
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description="Auto-responder for LLM requests")
     parser.add_argument("--continuous", action="store_true", help="Run continuously")
-    parser.add_argument("--interval", type=float, default=1.0, help="Sleep interval in seconds")
+    parser.add_argument(
+        "--interval", type=float, default=1.0, help="Polling interval in seconds (with --poll or without watchfiles)"
+    )
+    parser.add_argument(
+        "--poll", action="store_true", help="Poll the request directory instead of using filesystem notifications"
+    )
     parser.add_argument("--base-dir", type=Path, default=None, help="Base directory")
+    parser.add_argument("--pretty", action="store_true", help="Indent response JSON for human inspection")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log request detection and scoring details")
 
     args = parser.parse_args()
 
-    responder = AutoResponder(base_dir=args.base_dir)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING, format="    [%(levelname)s] %(message)s"
+    )
+
+    responder = AutoResponder(base_dir=args.base_dir, pretty=args.pretty)
 
     try:
-        responder.process_requests(continuous=args.continuous, sleep_interval=args.interval)
+        responder.process_requests(continuous=args.continuous, sleep_interval=args.interval, poll=args.poll)
     except KeyboardInterrupt:
         print("\n\nAuto-responder stopped by user")
 
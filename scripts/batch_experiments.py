@@ -11,21 +11,41 @@ Usage:
 """
 
 import argparse
-import json
+import re
 import subprocess
 import sys
 import time
+from collections import deque
 from pathlib import Path
 from typing import Any, Dict, List
 
+try:
+    from prompt_tuning.json_io import dump_json, load_json
+except ImportError:
+    from scripts.prompt_tuning.json_io import dump_json, load_json
+
+
+# Lines of experiment output kept in the batch results; the full output stays in the log files
+OUTPUT_TAIL_LINES = 200
+
+
+def _tail(path: Path, lines: int = OUTPUT_TAIL_LINES) -> str:
+    """Return the last lines of a log file without reading it all into memory."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return "".join(deque(f, maxlen=lines))
+
 
 class BatchExperimentRunner:
     """Run multiple experiments in batch."""
 
-    def __init__(self, output_dir: str = "batch_results"):
+    def __init__(self, output_dir: str = "batch_results", pretty: bool = False):
+        self.pretty = pretty
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.results: List[Dict[str, Any]] = []
+        # Maintained alongside results so summaries do not re-partition the list
+        self.successful: List[Dict[str, Any]] = []
+        self.failed: List[Dict[str, Any]] = []
 
     def run_experiment(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Run a single experiment with given configuration."""
@@ -58,28 +78,41 @@ class BatchExperimentRunner:
         if use_real_api:
             cmd.append("--real-api")
 
+        # Stream output to log files rather than buffering a 20-minute run in memory
+        log_prefix = f"{re.sub(r'[^A-Za-z0-9]+', '_', config.get('name', 'Unnamed'))}_{int(start_time)}"
+        stdout_log = self.output_dir / f"{log_prefix}_stdout.log"
+        stderr_log = self.output_dir / f"{log_prefix}_stderr.log"
+
         # Run experiment
         try:
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, timeout=1200, check=False
-            )  # 20 minute timeout
+            with open(stdout_log, "wb") as out, open(stderr_log, "wb") as err:
+                with subprocess.Popen(cmd, stdout=out, stderr=err) as proc:
+                    try:
+                        returncode = proc.wait(timeout=1200)  # 20 minute timeout
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+                        raise
 
             elapsed = time.time() - start_time
+            output = {
+                "stdout": _tail(stdout_log),
+                "stderr": _tail(stderr_log),
+                "stdout_log": str(stdout_log),
+                "stderr_log": str(stderr_log),
+            }
 
             # Parse results
             results_file = Path(f"prompt_tuning_results_{project}/optimization_final_results.json")
             if results_file.exists():
-                with open(results_file, "r", encoding="utf-8") as f:
-                    experiment_results = json.load(f)
+                experiment_results = load_json(results_file)
 
                 return {
                     "name": config.get("name", "Unnamed"),
                     "config": config,
-                    "success": result.returncode == 0,
+                    "success": returncode == 0,
                     "elapsed_seconds": elapsed,
                     "results": experiment_results,
-                    "stdout": result.stdout,
-                    "stderr": result.stderr,
+                    **output,
                 }
 
             return {
@@ -88,8 +121,7 @@ class BatchExperimentRunner:
                 "success": False,
                 "elapsed_seconds": elapsed,
                 "error": "Results file not found",
-                "stdout": result.stdout,
-                "stderr": result.stderr,
+                **output,
             }
         except subprocess.TimeoutExpired:
             return {
@@ -97,6 +129,8 @@ class BatchExperimentRunner:
                 "config": config,
                 "success": False,
                 "error": "Timeout after 20 minutes",
+                "stdout_log": str(stdout_log),
+                "stderr_log": str(stderr_log),
             }
         except (OSError, ValueError) as e:
             return {"name": config.get("name", "Unnamed"), "config": config, "success": False, "error": str(e)}
@@ -111,6 +145,7 @@ class BatchExperimentRunner:
             print(f"\n[{i}/{len(experiments)}] Starting experiment...")
             result = self.run_experiment(config)
             self.results.append(result)
+            (self.successful if result["success"] else self.failed).append(result)
 
             if result["success"]:
                 print(f"✅ Experiment completed in {result['elapsed_seconds']:.1f}s")
@@ -126,18 +161,14 @@ class BatchExperimentRunner:
         timestamp = int(time.time())
         results_file = self.output_dir / f"batch_results_{timestamp}.json"
 
-        with open(results_file, "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "total_experiments": len(self.results),
-                    "successful": sum(1 for r in self.results if r["success"]),
-                    "failed": sum(1 for r in self.results if not r["success"]),
-                    "experiments": self.results,
-                },
-                f,
-                indent=2,
-            )
+        batch = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "total_experiments": len(self.results),
+            "successful": len(self.successful),
+            "failed": len(self.failed),
+            "experiments": self.results,
+        }
+        dump_json(batch, results_file, pretty=self.pretty)
 
         print(f"\n✅ Batch results saved to: {results_file}")
 
@@ -147,8 +178,8 @@ class BatchExperimentRunner:
         print("BATCH SUMMARY")
         print("=" * 80)
 
-        successful = [r for r in self.results if r["success"]]
-        failed = [r for r in self.results if not r["success"]]
+        successful = self.successful
+        failed = self.failed
 
         print(f"\nTotal Experiments: {len(self.results)}")
         print(f"Successful: {len(successful)}")
@@ -188,15 +219,15 @@ def main():
     parser.add_argument("--iterations", type=int, default=20, help="Iterations per experiment")
     parser.add_argument("--config", type=str, help="JSON config file with experiment definitions")
     parser.add_argument("--output-dir", type=str, default="batch_results", help="Output directory")
+    parser.add_argument("--pretty", action="store_true", help="Indent the batch results JSON")
 
     args = parser.parse_args()
 
-    runner = BatchExperimentRunner(output_dir=args.output_dir)
+    runner = BatchExperimentRunner(output_dir=args.output_dir, pretty=args.pretty)
 
     if args.config:
         # Load experiments from config file
-        with open(args.config, "r", encoding="utf-8") as f:
-            config_data = json.load(f)
+        config_data = load_json(args.config)
         experiments = config_data.get("experiments", [])
     else:
         # Generate default experiments
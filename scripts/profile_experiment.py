@@ -6,12 +6,19 @@ Measures timing, memory usage, and system metrics.
 """
 
 import argparse
-import json
+import contextlib
+import io
+import os
 import subprocess
 import sys
 import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from prompt_tuning.json_io import dump_json, load_json
+except ImportError:
+    from scripts.prompt_tuning.json_io import dump_json, load_json
 
 
 class ExperimentProfiler:
@@ -31,8 +38,8 @@ class ExperimentProfiler:
             "improvement": 0,
         }
 
-    def profile_experiment(self, project: str, iterations: int) -> Dict[str, Any]:
-        """Profile a single experiment."""
+    def profile_experiment(self, project: str, iterations: int, isolated: bool = False) -> Dict[str, Any]:
+        """Profile a single experiment, in-process unless isolated in a fresh interpreter."""
         print("=" * 80)
         print("EXPERIMENT PROFILER")
         print("=" * 80)
@@ -47,19 +54,24 @@ class ExperimentProfiler:
         print("Starting experiment...")
         start = time.time()
 
-        result = subprocess.run(
-            [
-                sys.executable,
-                "scripts/run_autonomous_experiment.py",
-                "--project",
-                project,
-                "--iterations",
-                str(iterations),
-            ],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
+        exp_results: Optional[Dict[str, Any]] = None
+        if isolated:
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "scripts/run_autonomous_experiment.py",
+                    "--project",
+                    project,
+                    "--iterations",
+                    str(iterations),
+                ],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            success, stdout, stderr = result.returncode == 0, result.stdout, result.stderr
+        else:
+            success, stdout, stderr, exp_results = self._run_in_process(project, iterations)
 
         elapsed = time.time() - start
 
@@ -67,12 +79,12 @@ class ExperimentProfiler:
         self.metrics["end_time"] = time.time()
         self.metrics["duration_seconds"] = elapsed
 
-        # Parse results
+        # Parse results, unless the in-process run already loaded them
         results_file = Path(f"prompt_tuning_results_{project}/optimization_final_results.json")
-        if results_file.exists():
-            with open(results_file, "r", encoding="utf-8") as f:
-                exp_results = json.load(f)
+        if exp_results is None and results_file.exists():
+            exp_results = load_json(results_file)
 
+        if exp_results is not None:
             self.metrics["iterations_completed"] = len(exp_results.get("iteration_history", []))
             self.metrics["baseline_score"] = exp_results.get("baseline_score", 0)
             self.metrics["final_score"] = exp_results.get("final_score", 0)
@@ -82,20 +94,43 @@ class ExperimentProfiler:
             self.metrics["convergence_iteration"] = convergence.get("convergence_iteration")
             self.metrics["early_stop_savings"] = convergence.get("wasted_iterations", 0)
 
-            # Count requests (2 per iteration: simulation + evaluation)
-            self.metrics["requests_processed"] = self.metrics["iterations_completed"] * 2 + 2  # +2 for baseline
-
-        # Count LLM requests from files
+        # Count LLM responses written during this run; older runs leave their files behind
         llm_response_dir = Path(".pr-faq-validator/llm_responses")
         if llm_response_dir.exists():
-            self.metrics["requests_processed"] = len(list(llm_response_dir.glob("*.json")))
+            self.metrics["requests_processed"] = self._count_responses_since(llm_response_dir, start)
+        elif exp_results is not None:
+            # No file-based LLM traffic - estimate 2 requests per iteration (simulation + evaluation), +2 for baseline
+            self.metrics["requests_processed"] = self.metrics["iterations_completed"] * 2 + 2
 
-        self.metrics["success"] = result.returncode == 0
-        self.metrics["stdout"] = result.stdout
-        self.metrics["stderr"] = result.stderr
+        self.metrics["success"] = success
+        self.metrics["stdout"] = stdout
+        self.metrics["stderr"] = stderr
 
         return self.metrics
 
+    @staticmethod
+    def _count_responses_since(response_dir: Path, since: float) -> int:
+        """Count JSON response files modified at or after the given timestamp."""
+        with os.scandir(response_dir) as entries:
+            return sum(
+                1
+                for entry in entries
+                if entry.name.endswith(".json")
+                and entry.is_file(follow_symlinks=False)
+                and entry.stat(follow_symlinks=False).st_mtime >= since
+            )
+
+    @staticmethod
+    def _run_in_process(project: str, iterations: int) -> Tuple[bool, str, str, Optional[Dict[str, Any]]]:
+        """Run the experiment in this interpreter, capturing its output and final results."""
+        from run_autonomous_experiment import AutonomousExperiment  # pylint: disable=import-outside-toplevel
+
+        experiment = AutonomousExperiment(project=project, max_iterations=iterations)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            success = experiment.run()
+        return success, stdout.getvalue(), stderr.getvalue(), experiment.results
+
     def print_report(self):
         """Print profiling report."""
         print("\n" + "=" * 80)
@@ -139,8 +174,7 @@ class ExperimentProfiler:
 
     def save_report(self, output_file: str):
         """Save profiling report to JSON."""
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(self.metrics, f, indent=2)
+        dump_json(self.metrics, output_file)
         print(f"\n✅ Profiling report saved to: {output_file}")
 
 
@@ -150,11 +184,14 @@ def main():
     parser.add_argument("--project", type=str, default="pr-faq-validator", help="Project name")
     parser.add_argument("--iterations", type=int, default=10, help="Number of iterations")
     parser.add_argument("--output", type=str, default="profiling_report.json", help="Output file")
+    parser.add_argument(
+        "--isolated", action="store_true", help="Run the experiment in a separate Python process (for debugging)"
+    )
 
     args = parser.parse_args()
 
     profiler = ExperimentProfiler()
-    profiler.profile_experiment(args.project, args.iterations)
+    profiler.profile_experiment(args.project, args.iterations, isolated=args.isolated)
     profiler.print_report()
     profiler.save_report(args.output)
 
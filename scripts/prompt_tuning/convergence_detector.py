@@ -4,9 +4,14 @@ Convergence detection for evolutionary optimization.
 Detects when optimization has converged and should stop early.
 """
 
+import logging
+import math
+from collections import deque
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+log = logging.getLogger(__name__)
+
 
 @dataclass
 class ConvergenceConfig:
@@ -24,18 +29,50 @@ class ConvergenceConfig:
     # Track plateau variance
     track_plateau_variance: bool = True
 
+    # Scale patience with the recent improvement rate instead of using no_improvement_threshold
+    adaptive_patience: bool = False
+    min_patience: int = 3
+    max_patience: int = 10
+
+    # Number of recent iterations used to measure the improvement rate
+    patience_window: int = 10
+
 
 class ConvergenceDetector:
     """Detects convergence in optimization experiments."""
 
     def __init__(self, config: Optional[ConvergenceConfig] = None):
         self.config = config or ConvergenceConfig()
-        self.iteration_history: List[Dict[str, Any]] = []
+        # Per-iteration history, kept as parallel lists rather than one dict per iteration
+        self._iterations: List[int] = []
+        self._scores: List[float] = []
+        self._improved: List[bool] = []
+        self._best_scores: List[float] = []
+
+        # Indices of the first and the two most recent scoring improvements
+        self._first_improvement: Optional[int] = None
+        self._last_improvements: deque = deque(maxlen=2)
+
         self.best_score: float = 0.0
         self.no_improvement_count: int = 0
         self.converged: bool = False
         self.convergence_iteration: Optional[int] = None
 
+        # A new score must reach best_score * this factor to count as a significant improvement
+        self._improvement_factor = 1.0 + self.config.min_improvement_percent / 100.0
+
+        # Iterations without improvement tolerated before declaring convergence
+        self._recent_improved: deque = deque(maxlen=self.config.patience_window)
+        self.patience: int = (
+            self.config.max_patience if self.config.adaptive_patience else self.config.no_improvement_threshold
+        )
+
+        # Running aggregates over scores seen after convergence
+        self._plateau_sum: float = 0.0
+        self._plateau_count: int = 0
+        self._plateau_min: float = 0.0
+        self._plateau_max: float = 0.0
+
     def update(self, iteration: int, score: float, improved: bool) -> Dict[str, Any]:
         """
         Update convergence state with new iteration results.
@@ -49,16 +86,21 @@ class ConvergenceDetector:
             Dict with convergence status and recommendations
         """
         # Track iteration
-        self.iteration_history.append(
-            {"iteration": iteration, "score": score, "improved": improved, "best_score": max(self.best_score, score)}
-        )
+        self._iterations.append(iteration)
+        self._scores.append(score)
+        self._improved.append(improved)
+        best = self.best_score
+        self._best_scores.append(score if score > best else best)
+        if improved and score > 0:
+            index = len(self._scores) - 1
+            if self._first_improvement is None:
+                self._first_improvement = index
+            self._last_improvements.append(index)
 
         # Update best score
-        if score > self.best_score:
-            improvement_percent = ((score - self.best_score) / self.best_score * 100) if self.best_score > 0 else 100
-
+        if score > best:
             # Check if improvement is significant
-            if improvement_percent >= self.config.min_improvement_percent:
+            if score >= best * self._improvement_factor if best > 0 else self.config.min_improvement_percent <= 100:
                 self.best_score = score
                 self.no_improvement_count = 0
             else:
@@ -66,14 +108,47 @@ class ConvergenceDetector:
         else:
             self.no_improvement_count += 1
 
+        # Patience is long while improvements keep coming and shrinks as they become rare
+        self._recent_improved.append(improved)
+        if self.config.adaptive_patience and improved:
+            rate = sum(self._recent_improved) / len(self._recent_improved)
+            self.patience = max(
+                self.config.min_patience, min(self.config.max_patience, math.ceil(rate * self.config.max_patience))
+            )
+            log.debug("Iteration %d: improvement rate %.2f, patience %d", iteration, rate, self.patience)
+
         # Check for convergence
-        if self.no_improvement_count >= self.config.no_improvement_threshold:
+        if self.no_improvement_count >= self.patience:
             if not self.converged:
                 self.converged = True
                 self.convergence_iteration = iteration
 
+        # Fold plateau scores in as they arrive so status lookups stay O(1)
+        if self.config.track_plateau_variance and self.converged and iteration > self.convergence_iteration:
+            if self._plateau_count:
+                self._plateau_min = min(self._plateau_min, score)
+                self._plateau_max = max(self._plateau_max, score)
+            else:
+                self._plateau_min = self._plateau_max = score
+            self._plateau_sum += score
+            self._plateau_count += 1
+
         return self.get_status()
 
+    @property
+    def iteration_history(self) -> List[Dict[str, Any]]:
+        """Iteration history as a list of dicts, built on demand for reporting."""
+        return self.to_dicts()
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Zip the per-iteration lists into one dict per iteration."""
+        return [
+            {"iteration": iteration, "score": score, "improved": improved, "best_score": best_score}
+            for iteration, score, improved, best_score in zip(
+                self._iterations, self._scores, self._improved, self._best_scores
+            )
+        ]
+
     def should_stop(self) -> bool:
         """Check if optimization should stop early."""
         if not self.config.enable_early_stop:
@@ -89,30 +164,25 @@ class ConvergenceDetector:
             "converged": self.converged,
             "convergence_iteration": self.convergence_iteration,
             "no_improvement_count": self.no_improvement_count,
+            "patience": self.patience,
             "best_score": self.best_score,
             "should_stop": self.should_stop(),
             "plateau_variance": plateau_stats["variance"],
             "plateau_avg": plateau_stats["avg"],
-            "total_iterations": len(self.iteration_history),
+            "total_iterations": len(self._scores),
             "wasted_iterations": self._calculate_wasted_iterations(),
         }
 
     def _calculate_plateau_stats(self) -> Dict[str, float]:
         """Calculate statistics for plateau period."""
-        if not self.converged or not self.convergence_iteration:
-            return {"variance": 0.0, "avg": 0.0, "min": 0.0, "max": 0.0}
-
-        # Get scores after convergence
-        plateau_scores = [it["score"] for it in self.iteration_history if it["iteration"] > self.convergence_iteration]
-
-        if not plateau_scores:
+        if not self.converged or not self.convergence_iteration or not self._plateau_count:
             return {"variance": 0.0, "avg": 0.0, "min": 0.0, "max": 0.0}
 
         return {
-            "variance": max(plateau_scores) - min(plateau_scores),
-            "avg": sum(plateau_scores) / len(plateau_scores),
-            "min": min(plateau_scores),
-            "max": max(plateau_scores),
+            "variance": self._plateau_max - self._plateau_min,
+            "avg": self._plateau_sum / self._plateau_count,
+            "min": self._plateau_min,
+            "max": self._plateau_max,
         }
 
     def _calculate_wasted_iterations(self) -> int:
@@ -120,7 +190,7 @@ class ConvergenceDetector:
         if not self.converged or not self.convergence_iteration:
             return 0
 
-        total = len(self.iteration_history)
+        total = len(self._scores)
         return total - self.convergence_iteration
 
     def get_recommendations(self) -> List[str]:
@@ -142,13 +212,14 @@ class ConvergenceDetector:
                 "mutations are too aggressive. Consider reducing mutation strength."
             )
 
-        if len(self.iteration_history) >= 3:
+        scores, best_scores = self._scores, self._best_scores
+        if len(scores) >= 3:
             # Check for diminishing returns
-            improvements = [it for it in self.iteration_history if it["improved"] and it["score"] > 0]
-
-            if len(improvements) >= 2:
-                first_delta = improvements[0]["score"] - (improvements[0]["best_score"] - improvements[0]["score"])
-                last_delta = improvements[-1]["score"] - improvements[-2]["best_score"]
+            if len(self._last_improvements) == 2:
+                first = self._first_improvement
+                prev, last = self._last_improvements
+                first_delta = scores[first] - (best_scores[first] - scores[first])
+                last_delta = scores[last] - best_scores[prev]
 
                 if last_delta < first_delta / 2:
                     recommendations.append(
@@ -1,18 +1,23 @@
 """Evolutionary prompt tuner for PR-FAQ Validator."""
 
+import asyncio
+import hashlib
 import json
+import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 try:
     from convergence_detector import ConvergenceConfig, ConvergenceDetector
+    from json_io import dump_json
     from llm_client import create_llm_client
     from prompt_simulator import PromptSimulator
     from prompt_tuning_config import PromptTuningConfig, load_prompts, save_prompts
     from quality_evaluator import QualityEvaluator
 except ImportError:
     from scripts.prompt_tuning.convergence_detector import ConvergenceConfig, ConvergenceDetector
+    from scripts.prompt_tuning.json_io import dump_json
     from scripts.prompt_tuning.llm_client import create_llm_client
     from scripts.prompt_tuning.prompt_simulator import PromptSimulator
     from scripts.prompt_tuning.prompt_tuning_config import (
@@ -22,6 +27,8 @@ except ImportError:
     )
     from scripts.prompt_tuning.quality_evaluator import QualityEvaluator
 
+log = logging.getLogger(__name__)
+
 
 class EvolutionaryTuner:
     """Evolutionary optimization for PR-FAQ prompts."""
@@ -29,15 +36,25 @@ class EvolutionaryTuner:
     def __init__(self, config: PromptTuningConfig, enable_convergence_detection: bool = True):
         self.config = config
         self.mutation_client = create_llm_client(
-            provider=config.llm_provider, model=config.llm_model, mock=config.mock_mode
+            provider=config.llm_provider,
+            model=config.llm_model,
+            mock=config.mock_mode,
+            cache_dir=config.llm_cache_dir,
+        )
+        # Share one client, and with it connections, rate limits and the response cache, across stages.
+        # The evaluator can only share it when it uses the same model.
+        self.simulator = PromptSimulator(config, llm_client=self.mutation_client)
+        self.evaluator = QualityEvaluator(
+            config, evaluator_client=self.mutation_client if config.evaluator_model == config.llm_model else None
         )
-        self.simulator = PromptSimulator(config)
-        self.evaluator = QualityEvaluator(config)
 
         self.best_score = 0.0
         self.best_prompts: Dict[str, str] = {}
         self.iteration_history: List[Dict[str, Any]] = []
 
+        # Simulation and evaluation results keyed by prompt content, so repeated mutations are not re-scored
+        self._eval_cache: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
         # Convergence detection
         self.convergence_detector = (
             ConvergenceDetector(
@@ -45,6 +62,9 @@ class EvolutionaryTuner:
                     no_improvement_threshold=5,
                     min_improvement_percent=0.1,
                     enable_early_stop=enable_convergence_detection,
+                    adaptive_patience=config.adaptive_patience,
+                    min_patience=config.min_patience,
+                    max_patience=config.max_patience,
                 )
             )
             if enable_convergence_detection
@@ -53,6 +73,20 @@ class EvolutionaryTuner:
 
     async def run_evolution(self, max_iterations: Optional[int] = None) -> Dict[str, Any]:
         """Run evolutionary optimization."""
+        try:
+            return await self._run_evolution(max_iterations)
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the LLM clients used for mutation, simulation and evaluation."""
+        clients = (self.mutation_client, self.simulator.llm_client, self.evaluator.evaluator_client)
+        # Close each distinct client once; the stages may share one
+        for client in {id(client): client for client in clients}.values():
+            await client.aclose()
+
+    async def _run_evolution(self, max_iterations: Optional[int]) -> Dict[str, Any]:
+        """Run the baseline evaluation and the evolutionary loop."""
         if max_iterations is None:
             max_iterations = self.config.max_iterations
 
@@ -63,41 +97,36 @@ class EvolutionaryTuner:
             save_prompts(self.config, current_prompts)
 
         # Run baseline evaluation
-        print(f"[DEBUG] Before baseline eval - current_prompts keys: {list(current_prompts.keys())}")
-        print(f"[DEBUG] Before baseline eval - prompt length: {len(current_prompts.get('pr_faq_generation', ''))}")
-        print(
-            f"[DEBUG] Before baseline eval - prompt starts with: {current_prompts.get('pr_faq_generation', '')[:100]}"
-        )
+        log.debug("Before baseline eval - current_prompts keys: %s", list(current_prompts))
+        self._log_prompt("Before baseline eval", current_prompts)
 
         baseline_results = await self._evaluate_prompts(current_prompts, iteration=0)
         self.best_score = baseline_results["aggregate_scores"]["overall"]
         self.best_prompts = current_prompts.copy()
 
-        print(
-            f"[DEBUG] After baseline eval - current_prompts length: {len(current_prompts.get('pr_faq_generation', ''))}"
-        )
-        print(f"[DEBUG] After baseline eval - prompt starts with: {current_prompts.get('pr_faq_generation', '')[:100]}")
-        print(
-            f"[DEBUG] After baseline eval - best_prompts length: {len(self.best_prompts.get('pr_faq_generation', ''))}"
-        )
+        self._log_prompt("After baseline eval", current_prompts)
+        log.debug("After baseline eval - best_prompts length: %d", len(self.best_prompts.get("pr_faq_generation", "")))
         print(f"Baseline score: {self.best_score:.2f}")
 
+        stop_reason = "max_iterations"
+
         # Evolutionary loop
         for iteration in range(1, max_iterations + 1):
+            # Stop once the target is met, including by the baseline
+            if self._reached_target():
+                print(f"\n🎯 Target score {self.config.target_score:.2f} reached with score {self.best_score:.2f}")
+                print(f"Stopping early. Saved {max_iterations - iteration + 1} iterations.")
+                stop_reason = "target_score"
+                break
+
             print(f"\n=== Iteration {iteration}/{max_iterations} ===")
 
             # Mutate prompts
-            prompt_len = len(current_prompts.get("pr_faq_generation", ""))
-            prompt_start = current_prompts.get("pr_faq_generation", "")[:100]
-            print(f"[DEBUG] Iteration {iteration} - Before mutation - length: {prompt_len}")
-            print(f"[DEBUG] Iteration {iteration} - Before mutation - starts with: {prompt_start}")
+            self._log_prompt(f"Iteration {iteration} - Before mutation", current_prompts)
 
             mutated_prompts = await self._mutate_prompts(current_prompts, iteration)
 
-            mutated_len = len(mutated_prompts.get("pr_faq_generation", ""))
-            mutated_start = mutated_prompts.get("pr_faq_generation", "")[:100]
-            print(f"[DEBUG] Iteration {iteration} - After mutation - length: {mutated_len}")
-            print(f"[DEBUG] Iteration {iteration} - After mutation - starts with: {mutated_start}")
+            self._log_prompt(f"Iteration {iteration} - After mutation", mutated_prompts)
 
             # Evaluate mutated prompts
             results = await self._evaluate_prompts(mutated_prompts, iteration)
@@ -110,7 +139,8 @@ class EvolutionaryTuner:
             if improved:
                 print(f"✓ Improvement! {self.best_score:.2f} → {current_score:.2f}")
                 self.best_score = current_score
-                self.best_prompts = mutated_prompts.copy()
+                # _mutate_prompts builds a new dict each call and nothing mutates it, so no copy is needed
+                self.best_prompts = mutated_prompts
                 current_prompts = mutated_prompts
 
                 # Save improved prompts
@@ -132,6 +162,7 @@ class EvolutionaryTuner:
                     print(f"\n🎯 Convergence detected at iteration {convergence_status['convergence_iteration']}")
                     print(f"No improvement for {convergence_status['no_improvement_count']} consecutive iterations.")
                     print(f"Stopping early. Saved {max_iterations - iteration} iterations.")
+                    stop_reason = "converged"
                     break
 
         # Print convergence summary
@@ -145,6 +176,7 @@ class EvolutionaryTuner:
             "project": self.config.project_name,
             "timestamp": datetime.now().isoformat(),
             "max_iterations": max_iterations,
+            "stop_reason": stop_reason,
             "baseline_score": baseline_results["aggregate_scores"]["overall"],
             "final_score": self.best_score,
             "improvement": self.best_score - baseline_results["aggregate_scores"]["overall"],
@@ -158,35 +190,103 @@ class EvolutionaryTuner:
 
         return final_results
 
+    def _reached_target(self) -> bool:
+        """Whether the best score has reached the configured target score."""
+        return self.config.target_score is not None and self.best_score >= self.config.target_score
+
     async def _evaluate_prompts(self, prompts: Dict[str, str], iteration: int) -> Dict[str, Any]:
-        """Evaluate a set of prompts."""
-        # Temporarily save prompts for simulation
-        original_prompts = load_prompts(self.config)
-        save_prompts(self.config, prompts)
+        """Evaluate a set of prompts, reusing the result for prompts already evaluated."""
+        cache_key = self._prompts_key(prompts)
+        cached = self._eval_cache.get(cache_key)
+        if cached is not None:
+            cached_simulation, cached_evaluation = cached
+            print(f"Prompts unchanged since iteration {cached_evaluation['iteration']}, reusing evaluation.")
+            # Still write this iteration's files, so every iteration has its simulation and evaluation results
+            simulation_results = self._reuse_results(cached_simulation, iteration)
+            evaluation_results = self._reuse_results(cached_evaluation, iteration)
+            self.simulator.save_results(simulation_results, iteration)
+            self.evaluator.save_evaluation(evaluation_results, iteration)
+            return evaluation_results
 
+        # Run simulation against the candidate prompts directly (only improvements are written to disk),
+        # evaluating each test case as soon as its content is generated
+        test_case_results: Dict[int, Dict[str, Any]] = {}
+        evaluations: Dict[int, Dict[str, Any]] = {}
+        # One limit for generation and evaluation requests together, so max_concurrency bounds all of them
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+        async def evaluate(index: int, test_result: Dict[str, Any]) -> None:
+            async with semaphore:
+                evaluations[index] = await self.evaluator.evaluate_test_case(test_result)
+
+        tasks = []
         try:
-            # Run simulation
-            simulation_results = await self.simulator.run_simulation(iteration)
+            simulation = self.simulator.iter_simulation(iteration, prompts=prompts, semaphore=semaphore)
+            async for index, test_result in simulation:
+                test_case_results[index] = test_result
+                tasks.append(asyncio.create_task(evaluate(index, test_result)))
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        order = range(len(test_case_results))
+        simulation_results = self.simulator.build_results(iteration, [test_case_results[i] for i in order])
+        evaluation_results = self.evaluator.build_results(iteration, [evaluations[i] for i in order])
+
+        # Save results
+        self.simulator.save_results(simulation_results, iteration)
+        self.evaluator.save_evaluation(evaluation_results, iteration)
+
+        self._eval_cache[cache_key] = (simulation_results, evaluation_results)
+        return evaluation_results
+
+    @staticmethod
+    def _reuse_results(results: Dict[str, Any], iteration: int) -> Dict[str, Any]:
+        """Copy of cached simulation or evaluation results relabelled for another iteration."""
+        reused = dict(results, iteration=iteration, reused_from_iteration=results["iteration"])
+        if "test_case_results" in results:
+            reused["test_case_results"] = [dict(result, iteration=iteration) for result in results["test_case_results"]]
+        return reused
+
+    @staticmethod
+    def _prompts_key(prompts: Dict[str, str]) -> str:
+        """Content hash identifying a set of prompts."""
+        encoded = json.dumps(prompts, sort_keys=True).encode("utf-8")
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
 
-            # Evaluate results
-            evaluation_results = await self.evaluator.evaluate_results(simulation_results)
+    async def _mutate_prompts(self, prompts: Dict[str, str], iteration: int) -> Dict[str, str]:
+        """Generate mutated version of prompts, requesting all mutations as one batch."""
+        names = list(prompts)
+        mutation_prompts = [self._build_mutation_prompt(prompts[name], iteration) for name in names]
 
-            # Save results
-            self.simulator.save_results(simulation_results, iteration)
-            self.evaluator.save_evaluation(evaluation_results, iteration)
+        if log.isEnabledFor(logging.DEBUG):
+            for mutation_prompt in mutation_prompts:
+                log.debug("Mutation prompt length: %d", len(mutation_prompt))
+                log.debug("Mutation prompt first 150 chars: %.150s", mutation_prompt)
+                log.debug("Has 'Current prompt:': %s", "Current prompt:" in mutation_prompt)
 
-            return evaluation_results
-        finally:
-            # Restore original prompts after evaluation (will be overwritten if this was an improvement)
-            if iteration > 0:
-                save_prompts(self.config, original_prompts)
+        mutated_contents = await self.mutation_client.generate_batch(mutation_prompts, temperature=0.8)
 
-    async def _mutate_prompts(self, prompts: Dict[str, str], iteration: int) -> Dict[str, str]:
-        """Generate mutated version of prompts."""
-        mutated = {}
+        for mutated_content in mutated_contents:
+            log.debug("Mutated content length: %d", len(mutated_content))
+            log.debug("Mutated content first 150 chars: %.150s", mutated_content)
 
-        for prompt_name, prompt_content in prompts.items():
-            mutation_prompt = f"""You are an expert at optimizing LLM prompts for PR-FAQ generation.
+        return {name: mutated_content.strip() for name, mutated_content in zip(names, mutated_contents)}
+
+    @staticmethod
+    def _log_prompt(stage: str, prompts: Dict[str, str]) -> None:
+        """Log the length and start of the PR-FAQ generation prompt at debug level."""
+        if log.isEnabledFor(logging.DEBUG):
+            prompt = prompts.get("pr_faq_generation", "")
+            log.debug("%s - length: %d", stage, len(prompt))
+            log.debug("%s - starts with: %.100s", stage, prompt)
+
+    @staticmethod
+    def _build_mutation_prompt(prompt_content: str, iteration: int) -> str:
+        """Build the LLM request asking for an improved version of a prompt."""
+        return f"""You are an expert at optimizing LLM prompts for PR-FAQ generation.
 
 Current prompt:
 {prompt_content}
@@ -200,19 +300,6 @@ Based on iteration {iteration}, suggest an improved version of this prompt that
 Provide ONLY the improved prompt text, without any explanation or meta-commentary.
 """
 
-            print(f"[DEBUG-TUNER] Mutation prompt length: {len(mutation_prompt)}")
-            print(f"[DEBUG-TUNER] Mutation prompt first 150 chars: {mutation_prompt[:150]}")
-            print(f"[DEBUG-TUNER] Has 'Current prompt:': {'Current prompt:' in mutation_prompt}")
-
-            mutated_content = await self.mutation_client.generate(mutation_prompt, temperature=0.8)
-
-            print(f"[DEBUG-TUNER] Mutated content length: {len(mutated_content)}")
-            print(f"[DEBUG-TUNER] Mutated content first 150 chars: {mutated_content[:150]}")
-
-            mutated[prompt_name] = mutated_content.strip()
-
-        return mutated
-
     def _get_default_prompt(self) -> str:
         """Get default PR-FAQ generation prompt."""
         return """Generate a comprehensive PR-FAQ document following Amazon's format.
@@ -227,7 +314,6 @@ Create a press release and FAQ that clearly articulates the customer problem, so
         """Save final optimization results."""
         output_file = self.config.results_dir / "optimization_final_results.json"
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2)
+        dump_json(results, output_file)
 
         return output_file
@@ -0,0 +1,40 @@
+"""JSON file helpers shared by the prompt tuning package and the experiment scripts.
+
+Uses orjson when it is installed. The stdlib fallback writes the same output
+(UTF-8, non-ASCII characters unescaped), so files do not depend on which
+library wrote them.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional - fall back to the stdlib json module
+    orjson = None
+
+PathLike = Union[str, Path]
+
+
+def dumps_json(data: Any, pretty: bool = True) -> bytes:
+    """Serialize to UTF-8 JSON: 2-space indented when pretty, compact otherwise."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dump_json(data: Any, path: PathLike, pretty: bool = True) -> None:
+    """Write data to a JSON file."""
+    with open(path, "wb") as f:
+        f.write(dumps_json(data, pretty))
+
+
+def load_json(path: PathLike) -> Any:
+    """Read a JSON file."""
+    with open(path, "rb") as f:
+        content = f.read()
+    return orjson.loads(content) if orjson is not None else json.loads(content)
@@ -2,21 +2,53 @@
 
 import asyncio
 import hashlib
+import itertools
 import json
 import os
+import tempfile
 import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
+
+try:
+    from watchfiles import Change, awatch
+except ImportError:
+    # watchfiles is optional - fall back to polling the response directory
+    Change = awatch = None
 
 
 class LLMClient(ABC):
     """Abstract base class for LLM clients."""
 
+    @property
+    def prefers_batch(self) -> bool:
+        """Whether generate_batch submits a provider-side batch, so prompts should be grouped rather than streamed."""
+        return False
+
     @abstractmethod
     async def generate(self, prompt: str, **kwargs) -> str:
         """Generate text from prompt."""
 
+    async def aclose(self) -> None:
+        """Release any resources held by the client."""
+
+    async def generate_batch(self, prompts: List[str], max_concurrency: Optional[int] = None, **kwargs) -> List[str]:
+        """Generate text for several independent prompts, returning responses in prompt order.
+
+        The default issues concurrent generate() calls, at most max_concurrency at a time.
+        """
+        if not max_concurrency:
+            return list(await asyncio.gather(*(self.generate(prompt, **kwargs) for prompt in prompts)))
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def generate_bounded(prompt: str) -> str:
+            async with semaphore:
+                return await self.generate(prompt, **kwargs)
+
+        return list(await asyncio.gather(*(generate_bounded(prompt) for prompt in prompts)))
+
 
 class MockLLMClient(LLMClient):
     """Mock LLM client for testing without API keys."""
@@ -30,14 +62,15 @@ class MockLLMClient(LLMClient):
         self.call_count += 1
 
         # Create deterministic response based on prompt content
-        prompt_hash = hashlib.md5(prompt.encode()).hexdigest()[:8]
+        prompt_hash = hashlib.md5(prompt.encode(), usedforsecurity=False).hexdigest()[:8]
 
         # Detect what kind of response is needed based on prompt keywords
-        if "press release" in prompt.lower():
+        lowered = prompt.lower()
+        if "press release" in lowered:
             return self._generate_mock_press_release(prompt_hash)
-        if "faq" in prompt.lower() or "frequently asked" in prompt.lower():
+        if "faq" in lowered or "frequently asked" in lowered:
             return self._generate_mock_faq(prompt_hash)
-        if "evaluate" in prompt.lower() or "score" in prompt.lower():
+        if "evaluate" in lowered or "score" in lowered:
             return self._generate_mock_evaluation(prompt_hash)
         return self._generate_mock_generic(prompt_hash)
 
@@ -116,9 +149,9 @@ A: Comprehensive documentation, tutorials, and dedicated support channels will b
         return f"Mock LLM response (seed: {seed}). This is a simulated output for testing purposes."
 
 
-# Global request counter shared across all AssistantLLMClient instances
+# Global request ID sequence shared across all AssistantLLMClient instances
 # to prevent request ID collisions
-_global_request_counter = 0
+_request_ids = itertools.count(1)
 
 
 class AssistantLLMClient(LLMClient):
@@ -126,12 +159,20 @@ class AssistantLLMClient(LLMClient):
     File-based LLM client for AI assistant communication.
 
     Enables AI assistant (Claude) to act as the LLM without API keys.
-    Writes requests to .pr-faq-validator/llm_requests/ and polls for
-    responses in .pr-faq-validator/llm_responses/.
+    Writes requests to .pr-faq-validator/llm_requests/ and waits for
+    responses in .pr-faq-validator/llm_responses/, woken by file events
+    when the optional watchfiles package is installed and polling otherwise.
 
     Based on bloginator's AssistantLLMClient implementation.
     """
 
+    # Polling backoff without watchfiles: start short for quick replies, back off to the cap for slow ones
+    POLL_INTERVAL_MIN = 0.02
+    POLL_INTERVAL = 0.5
+
+    # With watchfiles, how often to recheck for a response in case its file event was missed
+    WATCH_RECHECK_INTERVAL = 5.0
+
     def __init__(self, model: str = "assistant-llm", timeout: int = 300):
         self.model = model
         self.timeout = timeout
@@ -144,11 +185,41 @@ class AssistantLLMClient(LLMClient):
         self.request_dir.mkdir(parents=True, exist_ok=True)
         self.response_dir.mkdir(parents=True, exist_ok=True)
 
+        # Response file name -> event set when that file appears
+        self._waiters: Dict[str, asyncio.Event] = {}
+        self._watch_task: Optional[asyncio.Task] = None
+        self._watch_stop: Optional[asyncio.Event] = None
+
+    def _register_waiter(self, response_name: str) -> Optional[asyncio.Event]:
+        """Register interest in a response file, starting the directory watcher if needed."""
+        if awatch is None:
+            return None
+
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_stop = asyncio.Event()
+            self._watch_task = asyncio.create_task(self._watch_responses(self._watch_stop))
+
+        waiter = self._waiters[response_name] = asyncio.Event()
+        return waiter
+
+    async def _watch_responses(self, stop_event: asyncio.Event) -> None:
+        """Wake the waiters for response files as they are written."""
+        async for changes in awatch(self.response_dir, stop_event=stop_event, recursive=False):
+            for change, path in changes:
+                waiter = self._waiters.get(os.path.basename(path))
+                if waiter is not None and change != Change.deleted:
+                    waiter.set()
+
+    async def aclose(self) -> None:
+        """Stop the response directory watcher."""
+        if self._watch_task is not None:
+            self._watch_stop.set()
+            await self._watch_task
+            self._watch_task = None
+
     async def generate(self, prompt: str, **kwargs) -> str:
         """Generate text via file-based communication with AI assistant."""
-        global _global_request_counter
-        _global_request_counter += 1
-        request_id = _global_request_counter
+        request_id = next(_request_ids)
 
         # Prepare request
         request_data = {
@@ -161,53 +232,169 @@ class AssistantLLMClient(LLMClient):
             "timestamp": time.time(),
         }
 
-        # Write request file
-        request_file = self.request_dir / f"request_{request_id:04d}.json"
-        with open(request_file, "w", encoding="utf-8") as f:
-            json.dump(request_data, f, indent=2)
-
-        # Poll for response
+        # IDs restart at 1 in every process, so a response with this name may be left over from
+        # an earlier run; remove it so it is not mistaken for the answer to this request
         response_file = self.response_dir / f"response_{request_id:04d}.json"
-        start_time = time.time()
-
-        while time.time() - start_time < self.timeout:
-            if response_file.exists():
-                with open(response_file, "r", encoding="utf-8") as f:
-                    response_data = json.load(f)
-                return response_data["content"]
+        response_file.unlink(missing_ok=True)
 
-            await asyncio.sleep(0.5)  # Poll every 500ms
+        # Start listening for the response before the request becomes visible
+        waiter = self._register_waiter(response_file.name)
 
+        try:
+            # Write request file
+            request_file = self.request_dir / f"request_{request_id:04d}.json"
+            with open(request_file, "w", encoding="utf-8") as f:
+                json.dump(request_data, f, indent=2)
+
+            # Wait for response
+            deadline = time.monotonic() + self.timeout
+            delay = self.POLL_INTERVAL_MIN
+            read_error = None
+
+            while time.monotonic() < deadline:
+                try:
+                    with open(response_file, "r", encoding="utf-8") as f:
+                        response_data = json.load(f)
+                    return response_data["content"]
+                except FileNotFoundError:
+                    read_error = None
+                except (json.JSONDecodeError, KeyError) as e:
+                    # Not every responder writes atomically, so the file may still be half written
+                    read_error = e
+
+                if waiter is None:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 1.5, self.POLL_INTERVAL)
+                else:
+                    # Recheck on the same backoff, since events are missed while a new watcher is starting up
+                    try:
+                        await asyncio.wait_for(waiter.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    waiter.clear()
+                    delay = min(delay * 1.5, self.WATCH_RECHECK_INTERVAL)
+        finally:
+            self._waiters.pop(response_file.name, None)
+
+        if read_error is not None:
+            raise TimeoutError(
+                f"No readable response received for request {request_id} after {self.timeout}s. "
+                f"Response file {response_file} could not be parsed: {read_error!r}"
+            )
         raise TimeoutError(
             f"No response received for request {request_id} after {self.timeout}s. "
             f"Expected response file: {response_file}"
         )
 
 
+class _TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        # Waiters queue on the lock, so tokens are handed out first come, first served
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, amount: float) -> None:
+        """Wait until the bucket holds amount tokens, then take them."""
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Client-side limit on requests and input tokens per minute.
+
+    Keeps concurrent calls under the account's rate limits instead of
+    letting them fail with 429s and retry one by one.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None, input_tokens_per_minute: Optional[int] = None):
+        self.requests = _TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.input_tokens = _TokenBucket(input_tokens_per_minute) if input_tokens_per_minute else None
+
+    async def acquire(self, input_tokens: int) -> None:
+        """Wait for capacity for one request with the given estimated input tokens."""
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.input_tokens is not None:
+            await self.input_tokens.acquire(input_tokens)
+
+
 class AnthropicClient(LLMClient):
     """Anthropic Claude client."""
 
-    def __init__(self, model: str = "claude-3-5-sonnet-20241022", api_key: Optional[str] = None):
+    def __init__(
+        self,
+        model: str = "claude-3-5-sonnet-20241022",
+        api_key: Optional[str] = None,
+        *,
+        use_batch_api: bool = False,
+        batch_poll_interval: float = 10.0,
+        batch_timeout: float = 3600.0,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         self.model = model
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        self.use_batch_api = use_batch_api
+        self.batch_poll_interval = batch_poll_interval
+        self.batch_timeout = batch_timeout
+        self.rate_limiter = rate_limiter
+        self._client = None
 
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment")
 
+    @property
+    def prefers_batch(self) -> bool:
+        """Whether requests go through the Message Batches API."""
+        return self.use_batch_api
+
+    def _get_client(self):
+        """Return the shared AsyncAnthropic client, creating it on first use.
+
+        Reusing one client keeps its HTTP connection pool warm across requests.
+        """
+        if self._client is None:
+            try:
+                import anthropic  # pylint: disable=import-outside-toplevel
+            except ImportError as exc:
+                raise ImportError(
+                    "anthropic package not installed. Run: pip install anthropic"
+                ) from exc
+
+            self._client = anthropic.AsyncAnthropic(api_key=self.api_key)
+
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared AsyncAnthropic client."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
     async def generate(self, prompt: str, **kwargs) -> str:
         """Generate text using Anthropic API."""
-        try:
-            import anthropic  # pylint: disable=import-outside-toplevel
-        except ImportError as exc:
-            raise ImportError(
-                "anthropic package not installed. Run: pip install anthropic"
-            ) from exc
-
-        client = anthropic.AsyncAnthropic(api_key=self.api_key)
+        client = self._get_client()
 
         temperature = kwargs.get("temperature", 1.0)
         max_tokens = kwargs.get("max_tokens", 4096)
 
+        if self.rate_limiter is not None:
+            # Roughly 4 characters per token
+            await self.rate_limiter.acquire(len(prompt) // 4 + 1)
+
         message = await client.messages.create(
             model=self.model,
             max_tokens=max_tokens,
@@ -217,19 +404,155 @@ class AnthropicClient(LLMClient):
 
         return message.content[0].text
 
+    async def generate_batch(self, prompts: List[str], max_concurrency: Optional[int] = None, **kwargs) -> List[str]:
+        """Generate text for several prompts, via the Message Batches API when use_batch_api is set.
+
+        Batches are billed at a discount but may take minutes to complete, so they suit
+        unattended tuning runs rather than interactive use.
+        """
+        if not self.use_batch_api or len(prompts) < 2:
+            return await super().generate_batch(prompts, max_concurrency=max_concurrency, **kwargs)
+
+        client = self._get_client()
+
+        params = {
+            "model": self.model,
+            "max_tokens": kwargs.get("max_tokens", 4096),
+            "temperature": kwargs.get("temperature", 1.0),
+        }
+        batch = await client.messages.batches.create(
+            requests=[
+                {"custom_id": f"prompt-{i}", "params": {**params, "messages": [{"role": "user", "content": prompt}]}}
+                for i, prompt in enumerate(prompts)
+            ]
+        )
+
+        deadline = time.monotonic() + self.batch_timeout
+        while batch.processing_status != "ended":
+            if time.monotonic() >= deadline:
+                await client.messages.batches.cancel(batch.id)
+                raise TimeoutError(f"Batch {batch.id} did not finish within {self.batch_timeout}s and was cancelled")
+            await asyncio.sleep(self.batch_poll_interval)
+            batch = await client.messages.batches.retrieve(batch.id)
+
+        # Results arrive in arbitrary order; custom_id maps each back to its prompt
+        responses: Dict[str, str] = {}
+        async for entry in await client.messages.batches.results(batch.id):
+            if entry.result.type != "succeeded":
+                raise RuntimeError(f"Batch request {entry.custom_id} in batch {batch.id} {entry.result.type}")
+            responses[entry.custom_id] = entry.result.message.content[0].text
+
+        custom_ids = [f"prompt-{i}" for i in range(len(prompts))]
+        missing = [custom_id for custom_id in custom_ids if custom_id not in responses]
+        if missing:
+            raise RuntimeError(f"Batch {batch.id} returned no result for {', '.join(missing)}")
+
+        return [responses[custom_id] for custom_id in custom_ids]
+
+
+class CachedLLMClient(LLMClient):
+    """
+    Exact-match response cache around another LLM client.
+
+    Responses are stored on disk under cache_dir, keyed by a hash of the model,
+    prompt and generation options, so an identical request is answered without
+    calling the LLM again - including in later runs.
+    """
+
+    def __init__(self, client: LLMClient, cache_dir: Path):
+        self.client = client
+        self.model = getattr(client, "model", "")
+        self.cache_dir = cache_dir
+
+    @property
+    def prefers_batch(self) -> bool:
+        """Whether the wrapped client prefers batches."""
+        return self.client.prefers_batch
+
+    def _cache_path(self, prompt: str, kwargs: Dict) -> Path:
+        """Path of the cache entry for a request."""
+        request = json.dumps({"model": self.model, "prompt": prompt, **kwargs}, sort_keys=True)
+        key = hashlib.blake2b(request.encode("utf-8"), digest_size=16).hexdigest()
+        return self.cache_dir / key[:2] / f"{key[2:]}.json"
+
+    @staticmethod
+    def _read(path: Path) -> Optional[str]:
+        """Read a cached response, or None on a miss."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["content"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @staticmethod
+    def _write(path: Path, content: str) -> None:
+        """Atomically write a cache entry."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False) as f:
+            json.dump({"content": content}, f)
+        os.replace(f.name, path)
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        """Return the cached response for this request, generating and caching it on a miss."""
+        path = self._cache_path(prompt, kwargs)
+        content = self._read(path)
+        if content is None:
+            content = await self.client.generate(prompt, **kwargs)
+            self._write(path, content)
+        return content
+
+    async def generate_batch(self, prompts: List[str], max_concurrency: Optional[int] = None, **kwargs) -> List[str]:
+        """Answer cached prompts from disk and send only the misses to the wrapped client, as one batch."""
+        paths = [self._cache_path(prompt, kwargs) for prompt in prompts]
+        contents = [self._read(path) for path in paths]
+
+        misses = [i for i, content in enumerate(contents) if content is None]
+        if misses:
+            generated = await self.client.generate_batch(
+                [prompts[i] for i in misses], max_concurrency=max_concurrency, **kwargs
+            )
+            for i, content in zip(misses, generated):
+                self._write(paths[i], content)
+                contents[i] = content
+
+        return contents
+
+    async def aclose(self) -> None:
+        """Close the wrapped client."""
+        await self.client.aclose()
+
 
 def create_llm_client(
-    provider: str = "anthropic", model: str = "claude-3-5-sonnet-20241022", mock: bool = False
+    provider: str = "anthropic",
+    model: str = "claude-3-5-sonnet-20241022",
+    mock: bool = False,
+    cache_dir: Optional[Path] = None,
 ) -> LLMClient:
-    """Factory function to create LLM client."""
+    """Factory function to create LLM client.
+
+    When cache_dir is given, responses from real (non-mock) clients are cached there.
+    """
     if mock or os.getenv("AI_AGENT_MOCK_MODE", "false").lower() == "true":
         return MockLLMClient(model=model)
 
+    client: LLMClient
     # Check for assistant mode (file-based communication)
     if provider == "assistant" or os.getenv("LLM_PROVIDER") == "assistant":
-        return AssistantLLMClient(model=model)
-
-    if provider == "anthropic":
-        return AnthropicClient(model=model)
+        client = AssistantLLMClient(model=model)
+    elif provider == "anthropic":
+        use_batch_api = os.getenv("ANTHROPIC_USE_BATCH_API", "false").lower() == "true"
+        batch_timeout = float(os.getenv("ANTHROPIC_BATCH_TIMEOUT", "3600"))
+        rate_limiter = None
+        requests_per_minute = int(os.getenv("ANTHROPIC_REQUESTS_PER_MINUTE", "0"))
+        input_tokens_per_minute = int(os.getenv("ANTHROPIC_INPUT_TOKENS_PER_MINUTE", "0"))
+        if requests_per_minute or input_tokens_per_minute:
+            rate_limiter = RateLimiter(requests_per_minute, input_tokens_per_minute)
+        client = AnthropicClient(
+            model=model, use_batch_api=use_batch_api, batch_timeout=batch_timeout, rate_limiter=rate_limiter
+        )
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
 
-    raise ValueError(f"Unsupported LLM provider: {provider}")
+    if cache_dir is not None:
+        return CachedLLMClient(client, cache_dir)
+    return client
@@ -1,65 +1,122 @@
 """Prompt simulator for PR-FAQ Validator."""
 
-import json
+import asyncio
+import re
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 try:
-    from llm_client import create_llm_client
+    from json_io import dump_json
+    from llm_client import LLMClient, create_llm_client
     from prompt_tuning_config import PromptTuningConfig, load_prompts, load_test_cases
 except ImportError:
-    from scripts.prompt_tuning.llm_client import create_llm_client
+    from scripts.prompt_tuning.json_io import dump_json
+    from scripts.prompt_tuning.llm_client import LLMClient, create_llm_client
     from scripts.prompt_tuning.prompt_tuning_config import (
         PromptTuningConfig,
         load_prompts,
         load_test_cases,
     )
 
+# Template placeholders such as {projectName}; str.format_map is not used because
+# mutated prompts may contain literal braces (e.g. JSON examples)
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
 
 class PromptSimulator:
     """Simulates PR-FAQ generation using current prompts."""
 
-    def __init__(self, config: PromptTuningConfig):
+    def __init__(self, config: PromptTuningConfig, llm_client: Optional[LLMClient] = None):
         self.config = config
-        self.llm_client = create_llm_client(provider=config.llm_provider, model=config.llm_model, mock=config.mock_mode)
-
-    async def run_simulation(self, iteration: int = 0) -> Dict[str, Any]:
-        """Run simulation for all test cases."""
-        test_cases_data = load_test_cases(self.config)
-        test_cases = test_cases_data.get("test_cases", [])
-        prompts = load_prompts(self.config)
-
-        results = {
+        # A client passed in is shared with the caller, which is responsible for closing it
+        self.llm_client = llm_client or create_llm_client(
+            provider=config.llm_provider,
+            model=config.llm_model,
+            mock=config.mock_mode,
+            cache_dir=config.llm_cache_dir,
+        )
+
+    async def run_simulation(self, iteration: int = 0, prompts: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Run simulation for all test cases, using prompts from disk unless given explicitly."""
+        test_cases, formatted_prompts = self._prepare_test_cases(prompts)
+
+        # Test cases are independent, so generate them as one batch with a bounded number in flight
+        contents = await self.llm_client.generate_batch(
+            formatted_prompts, max_concurrency=self.config.max_concurrency, temperature=self.config.temperature
+        )
+
+        test_case_results = [
+            self._build_test_case_result(test_case, iteration, content)
+            for test_case, content in zip(test_cases, contents)
+        ]
+        return self.build_results(iteration, test_case_results)
+
+    async def iter_simulation(
+        self,
+        iteration: int = 0,
+        prompts: Optional[Dict[str, str]] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Run all test cases concurrently, yielding (index, result) as each one finishes.
+
+        Lets callers start evaluating early results while later test cases are still generating.
+        Clients that batch on the provider side get a single batch, yielded once it completes.
+        Pass a semaphore shared with other LLM work to keep max_concurrency a limit on all requests in flight.
+        """
+        test_cases, formatted_prompts = self._prepare_test_cases(prompts)
+
+        if self.llm_client.prefers_batch:
+            contents = await self.llm_client.generate_batch(formatted_prompts, temperature=self.config.temperature)
+            for index, (test_case, content) in enumerate(zip(test_cases, contents)):
+                yield index, self._build_test_case_result(test_case, iteration, content)
+            return
+
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+        async def run_test_case(index: int, test_case: Dict[str, Any], prompt: str) -> Tuple[int, Dict[str, Any]]:
+            async with semaphore:
+                content = await self.llm_client.generate(prompt, temperature=self.config.temperature)
+            return index, self._build_test_case_result(test_case, iteration, content)
+
+        pending = [run_test_case(i, tc, prompt) for i, (tc, prompt) in enumerate(zip(test_cases, formatted_prompts))]
+        for next_done in asyncio.as_completed(pending):
+            yield await next_done
+
+    def build_results(self, iteration: int, test_case_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Assemble per-test-case results into simulation results."""
+        return {
             "iteration": iteration,
             "timestamp": datetime.now().isoformat(),
             "project": self.config.project_name,
-            "test_case_results": [],
+            "test_case_results": test_case_results,
         }
 
-        for test_case in test_cases:
-            result = await self._run_test_case(test_case, prompts, iteration)
-            results["test_case_results"].append(result)
-
-        return results
-
-    async def _run_test_case(
-        self, test_case: Dict[str, Any], prompts: Dict[str, str], iteration: int
-    ) -> Dict[str, Any]:
-        """Run a single test case."""
-        test_case_id = test_case.get("id", "unknown")
-        inputs = test_case.get("inputs", {})
+    def _prepare_test_cases(self, prompts: Optional[Dict[str, str]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Load the test cases and format the PR-FAQ generation prompt for each one."""
+        test_cases_data = load_test_cases(self.config)
+        test_cases = test_cases_data.get("test_cases", [])
+        if prompts is None:
+            prompts = load_prompts(self.config)
 
-        # Generate PR-FAQ using prompts
-        pr_faq_content = await self._generate_pr_faq(inputs, prompts)
+        pr_faq_prompt = prompts.get("pr_faq_generation", self._get_default_prompt())
+        return test_cases, [self._format_prompt(pr_faq_prompt, tc.get("inputs", {})) for tc in test_cases]
 
+    def _build_test_case_result(self, test_case: Dict[str, Any], iteration: int, content: str) -> Dict[str, Any]:
+        """Build the result record for a single test case."""
         result = {
-            "test_case_id": test_case_id,
+            "test_case_id": test_case.get("id", "unknown"),
             "test_case_name": test_case.get("name", ""),
             "iteration": iteration,
             "timestamp": datetime.now().isoformat(),
-            "inputs": inputs,
-            "generated_content": pr_faq_content,
+            "inputs": test_case.get("inputs", {}),
+            # Parse into sections
+            "generated_content": {
+                "full_content": content,
+                "press_release": self._extract_section(content, "press release"),
+                "faq": self._extract_section(content, "faq"),
+            },
             "metadata": {
                 "industry": test_case.get("industry", ""),
                 "project_type": test_case.get("project_type", ""),
@@ -69,31 +126,14 @@ class PromptSimulator:
 
         return result
 
-    async def _generate_pr_faq(self, inputs: Dict[str, Any], prompts: Dict[str, str]) -> Dict[str, str]:
-        """Generate PR-FAQ content using LLM."""
-        # Get the main PR-FAQ generation prompt
-        pr_faq_prompt = prompts.get("pr_faq_generation", self._get_default_prompt())
-
-        # Format prompt with inputs
-        formatted_prompt = self._format_prompt(pr_faq_prompt, inputs)
-
-        # Generate content
-        content = await self.llm_client.generate(formatted_prompt, temperature=self.config.temperature)
-
-        # Parse into sections
-        return {
-            "full_content": content,
-            "press_release": self._extract_section(content, "press release"),
-            "faq": self._extract_section(content, "faq"),
-        }
-
     def _format_prompt(self, prompt: str, inputs: Dict[str, Any]) -> str:
         """Format prompt template with inputs."""
-        formatted = prompt
-        for key, value in inputs.items():
-            placeholder = f"{{{key}}}"
-            formatted = formatted.replace(placeholder, str(value))
-        return formatted
+        # Substitute every placeholder in one pass; unknown placeholders and other braces are left as-is
+        def substitute(match: re.Match) -> str:
+            key = match.group(1)
+            return str(inputs[key]) if key in inputs else match.group(0)
+
+        return _PLACEHOLDER.sub(substitute, prompt)
 
     def _extract_section(self, content: str, section_name: str) -> str:
         """Extract a specific section from generated content."""
@@ -149,7 +189,6 @@ The FAQ should address:
 
         output_file = self.config.results_dir / f"simulation_iteration_{iteration:03d}.json"
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2)
+        dump_json(results, output_file)
 
         return output_file
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """PR-FAQ Validator Prompt Tuning Tool - Command Line Interface."""
 
-import asyncio
+import importlib.util
 import json
 import os
 import sys
@@ -9,24 +9,37 @@ from pathlib import Path
 
 import click
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
 
 # Add scripts directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from evolutionary_tuner import EvolutionaryTuner  # pylint: disable=wrong-import-position
-from prompt_simulator import PromptSimulator  # pylint: disable=wrong-import-position
+# asyncio, rich.progress/rich.table and the tuner modules are imported inside
+# the subcommands that use them so --help, init and status start quickly
+from json_io import load_json  # pylint: disable=wrong-import-position
 from prompt_tuning_config import (  # pylint: disable=wrong-import-position
     get_env_file_template,
     load_project_config,
     validate_api_keys,
 )
-from quality_evaluator import QualityEvaluator  # pylint: disable=wrong-import-position
 
 console = Console()
 
 
+# Subcommands that read LLM settings and API keys from the environment
+ENV_COMMANDS = {"simulate", "evaluate", "evolve"}
+
+
+def _load_env_file():
+    """Load .env into the environment if it exists and python-dotenv is installed."""
+    # dotenv is optional - skip the import machinery entirely when it is absent
+    if not os.path.isfile(".env") or importlib.util.find_spec("dotenv") is None:
+        return
+
+    from dotenv import load_dotenv  # pylint: disable=import-outside-toplevel
+
+    load_dotenv()
+
+
 @click.group()
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
 @click.pass_context
@@ -35,6 +48,9 @@ def cli(ctx, verbose):
     ctx.ensure_object(dict)
     ctx.obj["verbose"] = verbose
 
+    if ctx.invoked_subcommand in ENV_COMMANDS:
+        _load_env_file()
+
 
 @cli.command()
 @click.argument("project_name")
@@ -109,7 +125,7 @@ def init(project_name, base_dir):
         }
 
         with open(test_cases_file, "w", encoding="utf-8") as f:
-            json.dump(sample_test_cases, f, indent=2)
+            f.write(json.dumps(sample_test_cases, indent=2))
 
         console.print(f"[green]Created sample test cases at {test_cases_file}[/green]")
         console.print("[yellow]Please customize the test cases for your project[/yellow]")
@@ -144,6 +160,14 @@ def simulate(project_name, iteration, mock):
 
     console.print(f"[bold blue]Running simulation for {project_name} (iteration {iteration})[/bold blue]")
 
+    # pylint: disable=import-outside-toplevel
+    import asyncio
+
+    from prompt_simulator import PromptSimulator
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
+    # pylint: enable=import-outside-toplevel
+
     async def run_simulation():
         simulator = PromptSimulator(config)
 
@@ -177,6 +201,14 @@ def evaluate(project_name, iteration, mock):
 
     console.print(f"[bold blue]Evaluating results for {project_name} (iteration {iteration})[/bold blue]")
 
+    # pylint: disable=import-outside-toplevel
+    import asyncio
+
+    from quality_evaluator import QualityEvaluator
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
+    # pylint: enable=import-outside-toplevel
+
     async def run_evaluation():
         # Load simulation results
         sim_file = config.results_dir / f"simulation_iteration_{iteration:03d}.json"
@@ -185,8 +217,7 @@ def evaluate(project_name, iteration, mock):
             console.print("Run 'simulate' command first")
             sys.exit(1)
 
-        with open(sim_file, "r", encoding="utf-8") as f:
-            simulation_results = json.load(f)
+        simulation_results = load_json(sim_file)
 
         evaluator = QualityEvaluator(config)
 
@@ -216,11 +247,24 @@ def evaluate(project_name, iteration, mock):
 @cli.command()
 @click.argument("project_name")
 @click.option("--max-iterations", "-n", default=20, help="Maximum number of iterations")
+@click.option("--target-score", type=float, default=None, help="Stop once the best score reaches this value (0-100)")
+@click.option(
+    "--adaptive-patience",
+    is_flag=True,
+    help="Shrink the no-improvement patience as improvements become rare instead of using a fixed 5",
+)
+@click.option("--min-patience", default=3, help="Smallest patience with --adaptive-patience")
+@click.option("--max-patience", default=10, help="Largest patience with --adaptive-patience")
 @click.option("--mock", is_flag=True, help="Run in AI agent mock mode (no API keys required)")
-def evolve(project_name, max_iterations, mock):
+# pylint: disable-next=too-many-positional-arguments
+def evolve(project_name, max_iterations, target_score, adaptive_patience, min_patience, max_patience, mock):
     """Run evolutionary prompt optimization"""
     config = load_project_config(project_name)
     config.max_iterations = max_iterations
+    config.target_score = target_score
+    config.adaptive_patience = adaptive_patience
+    config.min_patience = min_patience
+    config.max_patience = max_patience
 
     # Set mock mode if requested
     if mock:
@@ -239,6 +283,17 @@ def evolve(project_name, max_iterations, mock):
 
     console.print(f"[bold blue]Starting evolutionary optimization for {project_name}[/bold blue]")
     console.print(f"Max iterations: {max_iterations}")
+    if target_score is not None:
+        console.print(f"Target score: {target_score:.2f}")
+    if adaptive_patience:
+        console.print(f"Adaptive patience: {min_patience}-{max_patience} iterations")
+
+    # pylint: disable=import-outside-toplevel
+    import asyncio
+
+    from evolutionary_tuner import EvolutionaryTuner
+
+    # pylint: enable=import-outside-toplevel
 
     async def run_evolution():
         tuner = EvolutionaryTuner(config)
@@ -265,8 +320,7 @@ def status(project_name):
     # Check for final results
     final_results_file = config.results_dir / "optimization_final_results.json"
     if final_results_file.exists():
-        with open(final_results_file, "r", encoding="utf-8") as f:
-            results = json.load(f)
+        results = load_json(final_results_file)
 
         console.print("[bold green]Optimization completed[/bold green]")
         console.print(f"Timestamp: {results.get('timestamp', 'N/A')}")
@@ -279,6 +333,8 @@ def status(project_name):
         # Show iteration history
         history = results.get("iteration_history", [])
         if history:
+            from rich.table import Table  # pylint: disable=import-outside-toplevel
+
             console.print("\n[bold]Recent Iterations:[/bold]")
             table = Table()
             table.add_column("Iteration", style="cyan")
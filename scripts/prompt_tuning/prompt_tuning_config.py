@@ -20,9 +20,25 @@ class PromptTuningConfig:
     llm_model: str = "claude-3-5-sonnet-20241022"
     evaluator_model: str = "claude-3-5-sonnet-20241022"
     max_iterations: int = 20
+
+    # Stop evolution early once the best overall score (0-100) reaches this value
+    target_score: Optional[float] = None
+
+    # Scale convergence patience with the recent improvement rate, between min_patience and max_patience
+    # iterations without improvement, instead of the fixed threshold of 5
+    adaptive_patience: bool = False
+    min_patience: int = 3
+    max_patience: int = 10
+
     temperature: float = 1.0
     mock_mode: bool = False
 
+    # Maximum number of LLM requests in flight at once
+    max_concurrency: int = 10
+
+    # Cache LLM responses on disk and reuse them for identical requests
+    cache_responses: bool = False
+
     # PR-FAQ specific settings
     validation_criteria: Dict[str, Any] = field(
         default_factory=lambda: {
@@ -33,6 +49,11 @@ class PromptTuningConfig:
         }
     )
 
+    @property
+    def llm_cache_dir(self) -> Optional[Path]:
+        """Directory for cached LLM responses, or None when caching is disabled."""
+        return self.results_dir / "llm_cache" if self.cache_responses else None
+
 
 def load_project_config(project_name: str, base_dir: Optional[Path] = None) -> PromptTuningConfig:
     """Load configuration for a prompt tuning project."""
@@ -56,6 +77,7 @@ def load_project_config(project_name: str, base_dir: Optional[Path] = None) -> P
         llm_model=os.getenv("LLM_MODEL", "claude-3-5-sonnet-20241022"),
         evaluator_model=os.getenv("EVALUATOR_MODEL", "claude-3-5-sonnet-20241022"),
         mock_mode=mock_mode,
+        cache_responses=os.getenv("LLM_CACHE_RESPONSES", "false").lower() == "true",
     )
 
     return config
@@ -93,6 +115,19 @@ LLM_PROVIDER=anthropic
 LLM_MODEL=claude-3-5-sonnet-20241022
 EVALUATOR_MODEL=claude-3-5-sonnet-20241022
 
+# Use Anthropic's Message Batches API for bulk requests (cheaper, but batches can take minutes)
+ANTHROPIC_USE_BATCH_API=false
+
+# Seconds to wait for a batch before cancelling it and failing the run
+ANTHROPIC_BATCH_TIMEOUT=3600
+
+# Client-side Anthropic rate limits (0 = unlimited); set to your account's limits
+ANTHROPIC_REQUESTS_PER_MINUTE=0
+ANTHROPIC_INPUT_TOKENS_PER_MINUTE=0
+
+# Cache LLM responses in the results directory and reuse them for identical requests
+LLM_CACHE_RESPONSES=false
+
 # AI Agent Mock Mode (set to true to run without API keys)
 AI_AGENT_MOCK_MODE=false
 """
@@ -115,7 +150,7 @@ def save_test_cases(config: PromptTuningConfig, test_cases: Dict[str, Any]) -> N
     config.results_dir.mkdir(parents=True, exist_ok=True)
 
     with open(config.test_cases_file, "w", encoding="utf-8") as f:
-        json.dump(test_cases, f, indent=2)
+        f.write(json.dumps(test_cases, indent=2))
 
 
 def load_prompts(config: PromptTuningConfig) -> Dict[str, str]:
@@ -1,48 +1,60 @@
 """Quality evaluator for PR-FAQ content."""
 
+import asyncio
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 try:
-    from llm_client import create_llm_client
+    from json_io import dump_json
+    from llm_client import LLMClient, create_llm_client
     from prompt_tuning_config import PromptTuningConfig
 except ImportError:
-    from scripts.prompt_tuning.llm_client import create_llm_client
+    from scripts.prompt_tuning.json_io import dump_json
+    from scripts.prompt_tuning.llm_client import LLMClient, create_llm_client
     from scripts.prompt_tuning.prompt_tuning_config import PromptTuningConfig
 
 
 class QualityEvaluator:
     """Evaluates quality of generated PR-FAQ content."""
 
-    def __init__(self, config: PromptTuningConfig):
+    def __init__(self, config: PromptTuningConfig, evaluator_client: Optional[LLMClient] = None):
         self.config = config
-        self.evaluator_client = create_llm_client(
-            provider=config.llm_provider, model=config.evaluator_model, mock=config.mock_mode
+        # A client passed in is shared with the caller, which is responsible for closing it
+        self.evaluator_client = evaluator_client or create_llm_client(
+            provider=config.llm_provider,
+            model=config.evaluator_model,
+            mock=config.mock_mode,
+            cache_dir=config.llm_cache_dir,
         )
 
     async def evaluate_results(self, simulation_results: Dict[str, Any]) -> Dict[str, Any]:
         """Evaluate simulation results."""
         test_case_results = simulation_results.get("test_case_results", [])
 
-        evaluation_results = {
-            "iteration": simulation_results.get("iteration", 0),
-            "timestamp": datetime.now().isoformat(),
-            "project": self.config.project_name,
-            "evaluations": [],
-        }
+        # Test cases are evaluated independently, so run them concurrently within the request limit
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+        async def evaluate_bounded(test_result: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.evaluate_test_case(test_result)
 
-        for test_result in test_case_results:
-            evaluation = await self._evaluate_test_case(test_result)
-            evaluation_results["evaluations"].append(evaluation)
+        evaluations = list(await asyncio.gather(*(evaluate_bounded(test_result) for test_result in test_case_results)))
 
-        # Calculate aggregate scores
-        evaluation_results["aggregate_scores"] = self._calculate_aggregate_scores(evaluation_results["evaluations"])
+        return self.build_results(simulation_results.get("iteration", 0), evaluations)
 
-        return evaluation_results
+    def build_results(self, iteration: int, evaluations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Assemble per-test-case evaluations into evaluation results with aggregate scores."""
+        return {
+            "iteration": iteration,
+            "timestamp": datetime.now().isoformat(),
+            "project": self.config.project_name,
+            "evaluations": evaluations,
+            "aggregate_scores": self._calculate_aggregate_scores(evaluations),
+        }
 
-    async def _evaluate_test_case(self, test_result: Dict[str, Any]) -> Dict[str, Any]:
+    async def evaluate_test_case(self, test_result: Dict[str, Any]) -> Dict[str, Any]:
         """Evaluate a single test case result using comprehensive LLM evaluation."""
         generated_content = test_result.get("generated_content", {})
         press_release = generated_content.get("press_release", "")
@@ -148,7 +160,6 @@ Return ONLY valid JSON matching this structure.
 
         output_file = self.config.results_dir / f"evaluation_iteration_{iteration:03d}.json"
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(evaluation_results, f, indent=2)
+        dump_json(evaluation_results, output_file)
 
         return output_file
@@ -1,12 +1,15 @@
 """Tests for core components (simulator, evaluator, tuner)."""
 
+import asyncio
 import json
 import tempfile
 from pathlib import Path
 
 import pytest
 
+from scripts.prompt_tuning.convergence_detector import ConvergenceConfig, ConvergenceDetector
 from scripts.prompt_tuning.evolutionary_tuner import EvolutionaryTuner
+from scripts.prompt_tuning.llm_client import MockLLMClient
 from scripts.prompt_tuning.prompt_simulator import PromptSimulator
 from scripts.prompt_tuning.prompt_tuning_config import load_project_config, save_prompts, save_test_cases
 from scripts.prompt_tuning.quality_evaluator import QualityEvaluator
@@ -62,6 +65,35 @@ class TestPromptSimulator:
         assert "test_case_results" in results
         assert len(results["test_case_results"]) == 1
 
+    async def test_run_simulation_preserves_test_case_order(self, config_with_test_cases):
+        """Test that concurrently run test cases come back in their original order."""
+        test_cases = [
+            {"id": f"test{i}", "name": f"Test Case {i}", "inputs": {"projectName": f"Project {i}"}} for i in range(5)
+        ]
+        save_test_cases(config_with_test_cases, {"test_cases": test_cases})
+        config_with_test_cases.max_concurrency = 2
+        simulator = PromptSimulator(config_with_test_cases)
+
+        results = await simulator.run_simulation(iteration=0)
+
+        assert [r["test_case_id"] for r in results["test_case_results"]] == [tc["id"] for tc in test_cases]
+
+    async def test_iter_simulation_yields_every_test_case(self, config_with_test_cases):
+        """Test that streamed simulation yields each test case once, matching the batch results."""
+        test_cases = [
+            {"id": f"test{i}", "name": f"Test Case {i}", "inputs": {"projectName": f"Project {i}"}} for i in range(5)
+        ]
+        save_test_cases(config_with_test_cases, {"test_cases": test_cases})
+        simulator = PromptSimulator(config_with_test_cases)
+
+        streamed = {index: result async for index, result in simulator.iter_simulation(iteration=1)}
+        batch = await simulator.run_simulation(iteration=1)
+
+        assert sorted(streamed) == list(range(5))
+        assert [streamed[i]["generated_content"] for i in range(5)] == [
+            r["generated_content"] for r in batch["test_case_results"]
+        ]
+
     async def test_save_results(self, config_with_test_cases):
         """Test saving simulation results."""
         simulator = PromptSimulator(config_with_test_cases)
@@ -91,6 +123,15 @@ class TestPromptSimulator:
         assert "MyProblem" in formatted
         assert "{projectName}" not in formatted
 
+    def test_format_prompt_keeps_literal_braces(self, config_with_test_cases):
+        """Test that unknown placeholders and JSON braces survive formatting."""
+        simulator = PromptSimulator(config_with_test_cases)
+
+        template = 'Project: {projectName} {unknown} {"score": 1}'
+        formatted = simulator._format_prompt(template, {"projectName": "MyProject"})
+
+        assert formatted == 'Project: MyProject {unknown} {"score": 1}'
+
     def test_extract_section(self, config_with_test_cases):
         """Test section extraction."""
         simulator = PromptSimulator(config_with_test_cases)
@@ -151,6 +192,43 @@ class TestQualityEvaluator:
         assert "evaluations" in eval_results
         assert "aggregate_scores" in eval_results
 
+    async def test_evaluate_results_preserves_test_case_order(self, config):
+        """Test that concurrently evaluated test cases come back in their original order."""
+        config.max_concurrency = 2
+        evaluator = QualityEvaluator(config)
+
+        simulation_results = {
+            "iteration": 1,
+            "test_case_results": [
+                {"test_case_id": f"test{i}", "generated_content": {"press_release": f"Press release {i}", "faq": ""}}
+                for i in range(5)
+            ],
+        }
+
+        eval_results = await evaluator.evaluate_results(simulation_results)
+
+        assert [e["test_case_id"] for e in eval_results["evaluations"]] == [f"test{i}" for i in range(5)]
+
+
+class _InFlightTrackingClient(MockLLMClient):
+    """Mock client that records the peak number of concurrent generate() calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return await super().generate(prompt, **kwargs)
+        finally:
+            self.in_flight -= 1
+
 
 class TestEvolutionaryTuner:
     """Tests for EvolutionaryTuner class."""
@@ -190,6 +268,123 @@ class TestEvolutionaryTuner:
         assert tuner.simulator is not None
         assert tuner.evaluator is not None
 
+    async def test_tuner_shares_llm_client_across_stages(self, config_with_data):
+        """Test that mutation, simulation and same-model evaluation use one client."""
+        tuner = EvolutionaryTuner(config_with_data)
+
+        assert tuner.simulator.llm_client is tuner.mutation_client
+        assert tuner.evaluator.evaluator_client is tuner.mutation_client
+
+        config_with_data.evaluator_model = "other-model"
+        tuner = EvolutionaryTuner(config_with_data)
+
+        assert tuner.evaluator.evaluator_client is not tuner.mutation_client
+
+    async def test_evaluate_prompts_reuses_cached_result(self, config_with_data):
+        """Test that identical prompts are only evaluated once, but still get per-iteration result files."""
+        tuner = EvolutionaryTuner(config_with_data)
+        prompts = {"pr_faq_generation": "Generate PR-FAQ for {projectName}"}
+
+        first = await tuner._evaluate_prompts(prompts, iteration=1)  # pylint: disable=protected-access
+        calls = tuner.mutation_client.call_count
+        second = await tuner._evaluate_prompts(dict(prompts), iteration=2)  # pylint: disable=protected-access
+
+        assert tuner.mutation_client.call_count == calls
+        assert second["aggregate_scores"] == first["aggregate_scores"]
+        assert second["iteration"] == 2
+        assert second["reused_from_iteration"] == 1
+        assert (config_with_data.results_dir / "simulation_iteration_002.json").exists()
+        assert (config_with_data.results_dir / "evaluation_iteration_002.json").exists()
+        assert not (config_with_data.prompts_dir / "pr_faq_generation.txt").exists()
+
+    async def test_evaluate_prompts_bounds_all_requests_in_flight(self, config_with_data):
+        """Test that generation and evaluation together stay within max_concurrency."""
+        test_cases = [{"id": f"test{i}", "name": f"Test Case {i}", "inputs": {}} for i in range(6)]
+        save_test_cases(config_with_data, {"test_cases": test_cases})
+        config_with_data.max_concurrency = 2
+        tuner = EvolutionaryTuner(config_with_data)
+
+        client = _InFlightTrackingClient()
+        tuner.simulator.llm_client = tuner.evaluator.evaluator_client = client
+        prompts = {"pr_faq_generation": "Press release"}
+        await tuner._evaluate_prompts(prompts, iteration=1)  # pylint: disable=protected-access
+
+        assert client.calls == 12
+        assert client.peak == 2
+
+    async def test_tuner_passes_adaptive_patience_to_detector(self, config_with_data):
+        """Test that adaptive patience settings reach the convergence detector."""
+        config_with_data.adaptive_patience = True
+        config_with_data.min_patience = 2
+        config_with_data.max_patience = 8
+        tuner = EvolutionaryTuner(config_with_data)
+
+        detector_config = tuner.convergence_detector.config
+        assert detector_config.adaptive_patience
+        assert (detector_config.min_patience, detector_config.max_patience) == (2, 8)
+        assert tuner.convergence_detector.patience == 8
+
+    async def test_run_evolution_stops_at_target_score(self, config_with_data):
+        """Test that evolution stops as soon as the best score reaches the target."""
+        config_with_data.target_score = 0.0
+        tuner = EvolutionaryTuner(config_with_data)
+
+        results = await tuner.run_evolution()
+
+        assert results["stop_reason"] == "target_score"
+        assert results["iteration_history"] == []
+
+
+class TestConvergenceDetector:
+    """Tests for ConvergenceDetector class."""
+
+    def test_plateau_stats_track_post_convergence_scores(self):
+        """Test that plateau stats cover only scores after convergence."""
+        detector = ConvergenceDetector(ConvergenceConfig(no_improvement_threshold=2))
+        scores = [50.0, 60.0, 59.0, 58.0, 62.0, 55.0, 57.0]
+
+        for iteration, score in enumerate(scores, 1):
+            status = detector.update(iteration, score, improved=False)
+
+        assert detector.convergence_iteration == 4
+        plateau = scores[4:]
+        stats = detector._calculate_plateau_stats()  # pylint: disable=protected-access
+        assert stats == {
+            "variance": max(plateau) - min(plateau),
+            "avg": sum(plateau) / len(plateau),
+            "min": min(plateau),
+            "max": max(plateau),
+        }
+        assert status["plateau_variance"] == stats["variance"]
+        assert status["wasted_iterations"] == len(scores) - 4
+
+    def test_plateau_stats_empty_before_convergence(self):
+        """Test that plateau stats are zero until convergence."""
+        detector = ConvergenceDetector()
+        status = detector.update(1, 50.0, improved=True)
+
+        assert status["plateau_variance"] == 0.0
+        assert status["plateau_avg"] == 0.0
+
+    def test_adaptive_patience_shrinks_as_improvements_slow(self):
+        """Test that adaptive patience follows the recent improvement rate."""
+        config = ConvergenceConfig(adaptive_patience=True, min_patience=3, max_patience=10, patience_window=5)
+        detector = ConvergenceDetector(config)
+        assert detector.patience == 10
+
+        detector.update(1, 50.0, improved=True)
+        assert detector.patience == 10
+
+        for iteration in range(2, 5):
+            detector.update(iteration, 40.0, improved=False)
+        detector.update(5, 60.0, improved=True)
+        assert detector.patience == 4
+
+        for iteration in range(6, 10):
+            status = detector.update(iteration, 40.0, improved=False)
+        assert status["converged"]
+        assert status["convergence_iteration"] == 9
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
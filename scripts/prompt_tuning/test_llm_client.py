@@ -1,8 +1,24 @@
 """Tests for LLM client with mock support."""
 
+import asyncio
+import itertools
+import json
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
 import pytest
 
-from scripts.prompt_tuning.llm_client import MockLLMClient, create_llm_client
+from scripts.prompt_tuning import llm_client
+from scripts.prompt_tuning.llm_client import (
+    AnthropicClient,
+    AssistantLLMClient,
+    CachedLLMClient,
+    MockLLMClient,
+    RateLimiter,
+    create_llm_client,
+)
 
 
 class TestMockLLMClient:
@@ -81,6 +97,237 @@ class TestMockLLMClient:
         await client.generate("Test prompt 2")
         assert client.call_count == 2
 
+    @pytest.mark.asyncio
+    async def test_generate_batch_preserves_order(self):
+        """Test that batch generation returns one response per prompt, in order."""
+        client = MockLLMClient()
+        prompts = ["Generate a press release", "Generate a FAQ", "Evaluate this", "Something else"]
+
+        responses = await client.generate_batch(prompts, max_concurrency=2)
+
+        assert responses == [await MockLLMClient().generate(prompt) for prompt in prompts]
+        assert client.call_count == len(prompts)
+
+
+class TestCachedLLMClient:
+    """Tests for CachedLLMClient."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_request_served_from_cache(self):
+        """Test that an identical request does not reach the wrapped client again."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inner = MockLLMClient()
+            client = CachedLLMClient(inner, Path(tmpdir))
+
+            first = await client.generate("Generate a press release", temperature=0.5)
+            second = await client.generate("Generate a press release", temperature=0.5)
+
+            assert first == second
+            assert inner.call_count == 1
+
+            await client.generate("Generate a press release", temperature=0.9)
+            assert inner.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_only_generates_misses(self):
+        """Test that batch generation reuses cached entries, including across instances."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            await CachedLLMClient(MockLLMClient(), Path(tmpdir)).generate("Generate a FAQ")
+
+            inner = MockLLMClient()
+            client = CachedLLMClient(inner, Path(tmpdir))
+            responses = await client.generate_batch(["Generate a FAQ", "Generate a press release"])
+
+            assert responses == [
+                await MockLLMClient().generate("Generate a FAQ"),
+                await MockLLMClient().generate("Generate a press release"),
+            ]
+            assert inner.call_count == 1
+
+
+class TestAssistantLLMClient:
+    """Tests for AssistantLLMClient."""
+
+    @pytest.mark.asyncio
+    async def test_ignores_response_left_over_from_earlier_run(self, monkeypatch, tmp_path):
+        """Test that a stale response file with the same request ID is not returned."""
+        monkeypatch.chdir(tmp_path)
+        client = AssistantLLMClient(timeout=5)
+
+        async def respond():
+            while not list(client.request_dir.glob("request_*.json")):
+                await asyncio.sleep(0.01)
+            request_file = next(client.request_dir.glob("request_*.json"))
+            response_file = client.response_dir / request_file.name.replace("request_", "response_")
+            response_file.write_text(json.dumps({"content": "fresh"}), encoding="utf-8")
+
+        # Restart request IDs as a new process would, with a response from an earlier run still present
+        monkeypatch.setattr(llm_client, "_request_ids", itertools.count(1))
+        (client.response_dir / "response_0001.json").write_text('{"content": "stale"}', encoding="utf-8")
+
+        responder = asyncio.create_task(respond())
+        try:
+            assert await client.generate("Generate a press release") == "fresh"
+        finally:
+            await responder
+            await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_waits_for_response_written_in_two_steps(self, monkeypatch, tmp_path):
+        """Test that a response file created before it is fully written is read once complete."""
+        monkeypatch.chdir(tmp_path)
+        client = AssistantLLMClient(timeout=5)
+
+        async def respond():
+            while not list(client.request_dir.glob("request_*.json")):
+                await asyncio.sleep(0.01)
+            request_file = next(client.request_dir.glob("request_*.json"))
+            response_file = client.response_dir / request_file.name.replace("request_", "response_")
+            with open(response_file, "w", encoding="utf-8") as f:
+                f.write('{"content": ')
+                f.flush()
+                await asyncio.sleep(0.3)
+                f.write('"complete"}')
+
+        responder = asyncio.create_task(respond())
+        try:
+            assert await client.generate("Generate a press release") == "complete"
+        finally:
+            await responder
+            await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_timeout_names_unreadable_response(self, monkeypatch, tmp_path):
+        """Test that the timeout error mentions a response file that never became valid JSON."""
+        monkeypatch.chdir(tmp_path)
+        client = AssistantLLMClient(timeout=0.2)
+        monkeypatch.setattr(llm_client, "_request_ids", itertools.count(1))
+
+        async def respond():
+            while not list(client.request_dir.glob("request_*.json")):
+                await asyncio.sleep(0.01)
+            (client.response_dir / "response_0001.json").write_text('{"content": ', encoding="utf-8")
+
+        responder = asyncio.create_task(respond())
+        try:
+            with pytest.raises(TimeoutError, match="could not be parsed"):
+                await client.generate("Generate a press release")
+        finally:
+            await responder
+            await client.aclose()
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_waits_once_bucket_is_drained(self):
+        """Test that requests beyond the per-minute budget wait for the bucket to refill."""
+        limiter = RateLimiter(input_tokens_per_minute=6000)  # refills 100 tokens per second
+
+        start = time.monotonic()
+        await limiter.acquire(6000)
+        assert time.monotonic() - start < 0.05
+
+        await limiter.acquire(10)
+        assert time.monotonic() - start >= 0.09
+
+
+def _batch_entry(custom_id, result_type="succeeded", text=""):
+    """Build a Message Batches result entry like those yielded by batches.results()."""
+    message = SimpleNamespace(content=[SimpleNamespace(text=text)])
+    return SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type=result_type, message=message))
+
+
+class _FakeBatches:
+    """Stand-in for AsyncAnthropic().messages.batches."""
+
+    def __init__(self, entries, polls_until_ended=1):
+        self.entries = entries
+        self.polls_until_ended = polls_until_ended
+        self.requests = None
+        self.retrieved = 0
+        self.cancelled = []
+
+    async def create(self, requests):
+        """Record the submitted requests and return a batch still in progress."""
+        self.requests = requests
+        return SimpleNamespace(id="batch-1", processing_status="in_progress")
+
+    async def retrieve(self, batch_id):
+        """Return the batch, ended once it has been polled polls_until_ended times."""
+        self.retrieved += 1
+        ended = self.polls_until_ended is not None and self.retrieved >= self.polls_until_ended
+        return SimpleNamespace(id=batch_id, processing_status="ended" if ended else "in_progress")
+
+    async def cancel(self, batch_id):
+        """Record the cancellation."""
+        self.cancelled.append(batch_id)
+
+    async def results(self, batch_id):  # pylint: disable=unused-argument
+        """Return an async iterator over the configured result entries."""
+        async def entries():
+            for entry in self.entries:
+                yield entry
+
+        return entries()
+
+
+class TestAnthropicBatchAPI:
+    """Tests for AnthropicClient.generate_batch with the Message Batches API."""
+
+    @staticmethod
+    def _client(batches, **kwargs):
+        client = AnthropicClient(api_key="test-key", use_batch_api=True, batch_poll_interval=0, **kwargs)
+        client._client = SimpleNamespace(messages=SimpleNamespace(batches=batches))
+        return client
+
+    @pytest.mark.asyncio
+    async def test_results_mapped_back_to_prompt_order(self):
+        """Test that out-of-order batch results are returned in prompt order."""
+        batches = _FakeBatches(
+            [
+                _batch_entry("prompt-2", text="c"),
+                _batch_entry("prompt-0", text="a"),
+                _batch_entry("prompt-1", text="b"),
+            ],
+            polls_until_ended=2,
+        )
+
+        responses = await self._client(batches).generate_batch(["A", "B", "C"], temperature=0.5)
+
+        assert responses == ["a", "b", "c"]
+        assert [request["custom_id"] for request in batches.requests] == ["prompt-0", "prompt-1", "prompt-2"]
+        assert batches.requests[1]["params"]["messages"] == [{"role": "user", "content": "B"}]
+        assert batches.requests[0]["params"]["temperature"] == 0.5
+        assert batches.retrieved == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_request_raises(self):
+        """Test that a request that did not succeed fails the batch."""
+        batches = _FakeBatches([_batch_entry("prompt-0", text="a"), _batch_entry("prompt-1", result_type="errored")])
+
+        with pytest.raises(RuntimeError, match="prompt-1 in batch batch-1 errored"):
+            await self._client(batches).generate_batch(["A", "B"])
+
+    @pytest.mark.asyncio
+    async def test_missing_result_raises(self):
+        """Test that a prompt without a result fails the batch."""
+        batches = _FakeBatches([_batch_entry("prompt-0", text="a")])
+
+        with pytest.raises(RuntimeError, match="no result for prompt-1"):
+            await self._client(batches).generate_batch(["A", "B"])
+
+    @pytest.mark.asyncio
+    async def test_stuck_batch_is_cancelled(self):
+        """Test that a batch still processing at the deadline is cancelled."""
+        batches = _FakeBatches([], polls_until_ended=None)
+
+        with pytest.raises(TimeoutError):
+            await self._client(batches, batch_timeout=0.05).generate_batch(["A", "B"])
+
+        assert batches.cancelled == ["batch-1"]
+
 
 class TestCreateLLMClient:
     """Tests for create_llm_client factory function."""
@@ -104,6 +351,30 @@ class TestCreateLLMClient:
         with pytest.raises(ValueError, match="ANTHROPIC_API_KEY"):
             create_llm_client(provider="anthropic", mock=False)
 
+    def test_create_anthropic_client_with_batch_api(self, monkeypatch):
+        """Test that the batch API is enabled from the environment."""
+        monkeypatch.delenv("AI_AGENT_MOCK_MODE", raising=False)
+        monkeypatch.delenv("LLM_PROVIDER", raising=False)
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setenv("ANTHROPIC_USE_BATCH_API", "true")
+
+        client = create_llm_client(provider="anthropic", mock=False)
+
+        assert client.use_batch_api
+
+    def test_create_anthropic_client_with_rate_limits(self, monkeypatch):
+        """Test that rate limits are read from the environment."""
+        monkeypatch.delenv("AI_AGENT_MOCK_MODE", raising=False)
+        monkeypatch.delenv("LLM_PROVIDER", raising=False)
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setenv("ANTHROPIC_REQUESTS_PER_MINUTE", "50")
+
+        client = create_llm_client(provider="anthropic", mock=False)
+
+        assert client.rate_limiter is not None
+        assert client.rate_limiter.requests is not None
+        assert client.rate_limiter.input_tokens is None
+
     def test_unsupported_provider(self, monkeypatch):
         """Test that unsupported provider raises error."""
         monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
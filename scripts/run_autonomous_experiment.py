@@ -33,6 +33,7 @@ class AutonomousExperiment:
         self.use_real_api = use_real_api
         self.auto_responder_process: Optional[subprocess.Popen] = None
         self.results_dir = Path(f"prompt_tuning_results_{project}")
+        self.results: Optional[Dict[str, Any]] = None
 
     def start_auto_responder(self) -> bool:
         """Start auto-responder in background."""
@@ -287,6 +288,7 @@ class AutonomousExperiment:
             results = self.analyze_results()
             if not results:
                 return False
+            self.results = results
 
             # Step 5: Generate report
             if not self.generate_report(results):